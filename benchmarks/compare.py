@@ -0,0 +1,41 @@
+# SIDE-BY-SIDE COMPARISON OF TWO benchmarks.endpoints RESULT FILES, E.G. FROM TWO COMMITS.
+# NEGATIVE DELTAS ARE IMPROVEMENTS FOR LATENCY AND QUERIES, POSITIVE ONES FOR THROUGHPUT.
+#
+# To run: python -m benchmarks.compare bench-small-abc123.json bench-small-def456.json
+import argparse
+import json
+
+METRICS = ("p50_ms", "p95_ms", "p99_ms", "throughput_rps", "queries_per_request")
+
+
+def _delta(old: float, new: float) -> str:
+    if not old:
+        return "n/a"
+    return f"{(new - old) / old * 100:+.0f}%"
+
+
+def compare(old: dict, new: dict) -> None:
+    print(f"old: {old.get('commit')} ({old.get('scale')}, c={old.get('concurrency')})")
+    print(f"new: {new.get('commit')} ({new.get('scale')}, c={new.get('concurrency')})")
+    new_results = {(r["method"], r["route"]): r for r in new["results"]}
+    for old_result in old["results"]:
+        key = (old_result["method"], old_result["route"])
+        new_result = new_results.pop(key, None)
+        print(f"\n{key[0]} {key[1]}")
+        if new_result is None:
+            print("  missing from new results")
+            continue
+        for metric in METRICS:
+            a, b = old_result[metric], new_result[metric]
+            print(f"  {metric:<22}{a:>10.1f}{b:>10.1f}{_delta(a, b):>8}")
+    for method, route in new_results:
+        print(f"\n{method} {route}\n  only in new results")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("old")
+    parser.add_argument("new")
+    args = parser.parse_args()
+    with open(args.old) as old_file, open(args.new) as new_file:
+        compare(json.load(old_file), json.load(new_file))
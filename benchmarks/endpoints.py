@@ -0,0 +1,368 @@
+# ENDPOINT BENCHMARK: DRIVES EVERY ROUTE OF THE CATEGORIES, EVENTS, ATTENDEES AND REGISTRATIONS ROUTERS THROUGH THE
+# REAL APP IN-PROCESS (httpx + ASGITransport, NO NETWORK) AGAINST THE DATABASE IN DATABASE_URL, AND REPORTS
+# p50/p95/p99 LATENCY, THROUGHPUT AND QUERIES PER REQUEST (FROM X-Query-Count) FOR EACH ROUTE.
+#
+# --seed WIPES THE FOUR TABLES AND LOADS THE CHOSEN SCALE FIRST. WITHOUT IT THE CURRENT DATA IS USED AS IS.
+# ROWS CREATED BY THE WRITE ROUTES ARE TAGGED AND REMOVED AT THE END, AND SEEDED REGISTRATIONS THEIR CANCELLATIONS
+# PROMOTED OFF A WAITLIST ARE PUT BACK ON IT, SO REPEATED RUNS SEE THE SAME DATA.
+# NEEDS THE DEV REQUIREMENTS (pip install -r requirements-dev.txt) FOR httpx.
+# RESULTS ARE WRITTEN AS JSON; COMPARE TWO COMMITS WITH python -m benchmarks.compare old.json new.json
+#
+# To run: python -m benchmarks.endpoints --scale small --seed --requests 200 --concurrency 10
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import text
+
+from src.database import engines
+from src.db.generate import GeneratorOptions, generate
+from src.main import app
+from src.services.registrations import recount_seats
+
+
+# THE SAME GENERATOR AS python -m src.db.seed --generate, WITH ITS DEFAULT ZIPF SKEW AND FIXED SEED, SO EVERY
+# --seed RUN AT A GIVEN SCALE PRODUCES IDENTICAL DATA
+SCALES = {
+    "small": GeneratorOptions(categories=10, events=200, attendees=2_000, registrations=10_000),
+    "medium": GeneratorOptions(categories=25, events=2_000, attendees=20_000, registrations=100_000),
+    "large": GeneratorOptions(categories=50, events=20_000, attendees=200_000, registrations=1_000_000),
+}
+
+
+@dataclass
+class Fixtures:
+    tag: str
+    categories: List[str]
+    events: List[str]
+    attendees: List[str]
+    registrations: List[str]
+    waitlisted: List[str]
+    # /attendees?search= TERMS TAKEN FROM THE DATA: EMAIL LOCAL PARTS, LAST NAMES AND PHONE NUMBER ENDINGS
+    searches: List[str]
+    # FILLED IN BY THE WRITE ROUTES AS THE RUN GOES
+    created: Dict[str, list] = field(default_factory=lambda: {
+        "categories": [], "events": [], "attendees": [], "registrations": [], "imports": [],
+    })
+
+
+async def load_fixtures(sample: int, stable: bool = False) -> Fixtures:
+    tag = uuid.uuid4().hex[:8]
+    # A RANDOM SAMPLE SPREADS THE LOAD; A stable ONE (ORDERED BY A HASH OF THE GENERATED IDS) PICKS THE SAME ROWS
+    # AND SEARCH TERMS ON EVERY RUN OVER THE SAME --seed DATA, SO THEIR PLANS CAN BE COMPARED RUN TO RUN
+    order = "md5(id::text)" if stable else "random()"
+    async with engines.primary.begin() as conn:
+        async def column(query: str) -> List[str]:
+            return [str(row[0]) for row in await conn.execute(text(query), {"n": sample})]
+
+        # CANCELLING A REGISTRATION PROMOTES THE HEAD OF THE EVENT'S WAITLIST; REMEMBER WHO WAS WAITING, WITH THEIR
+        # QUEUE NUMBERS, AND WHERE EACH QUEUE ENDED
+        await conn.execute(text(
+            f"CREATE UNLOGGED TABLE bench_waitlist_{tag} AS "
+            "SELECT id, updated_at, waitlist_seq FROM registrations WHERE status = 'waitlisted'"
+        ))
+        await conn.execute(text(
+            f"CREATE UNLOGGED TABLE bench_tails_{tag} AS SELECT id, waitlist_tail FROM events WHERE waitlist_tail > 0"
+        ))
+        fixtures = Fixtures(
+            tag=tag,
+            categories=await column(f"SELECT id FROM categories ORDER BY {order} LIMIT :n"),
+            events=await column(f"SELECT id FROM events ORDER BY {order} LIMIT :n"),
+            attendees=await column(f"SELECT id FROM attendees ORDER BY {order} LIMIT :n"),
+            registrations=await column(
+                f"SELECT id FROM registrations WHERE status <> 'waitlisted' ORDER BY {order} LIMIT :n"
+            ),
+            waitlisted=await column(
+                f"SELECT id FROM registrations WHERE status = 'waitlisted' ORDER BY {order} LIMIT :n"
+            ),
+            searches=await column(
+                "SELECT term FROM (SELECT id, unnest(ARRAY[split_part(email, '@', 1), lower(last_name), "
+                f"right(phone, 4)]) AS term FROM attendees) AS terms ORDER BY {order}, term LIMIT :n"
+            ),
+        )
+        if not (fixtures.categories and fixtures.events and fixtures.attendees and fixtures.registrations):
+            raise SystemExit("The database is empty; run with --seed first")
+    return fixtures
+
+
+async def cleanup(fixtures: Fixtures) -> None:
+    pattern = f"bench-{fixtures.tag}-%"
+    async with engines.primary.begin() as conn:
+        await conn.execute(text(
+            "DELETE FROM registrations WHERE attendee_id IN (SELECT id FROM attendees WHERE email LIKE :p)"
+        ), {"p": pattern})
+        await conn.execute(text(
+            "DELETE FROM registrations WHERE event_id IN (SELECT id FROM events WHERE title LIKE :p)"
+        ), {"p": pattern})
+        await conn.execute(text("DELETE FROM attendees WHERE email LIKE :p"), {"p": pattern})
+        await conn.execute(text("DELETE FROM events WHERE title LIKE :p"), {"p": pattern})
+        await conn.execute(text("DELETE FROM categories WHERE name LIKE :p"), {"p": pattern})
+        waitlist, tails = f"bench_waitlist_{fixtures.tag}", f"bench_tails_{fixtures.tag}"
+        await conn.execute(text(
+            "UPDATE registrations SET status = 'waitlisted', waitlist_seq = w.waitlist_seq, updated_at = w.updated_at "
+            f"FROM {waitlist} AS w WHERE registrations.id = w.id AND registrations.status <> 'waitlisted'"
+        ))
+        await conn.execute(text(
+            f"UPDATE events SET waitlist_tail = coalesce(t.waitlist_tail, 0) "
+            f"FROM events AS e LEFT JOIN {tails} AS t ON t.id = e.id "
+            "WHERE events.id = e.id AND events.waitlist_tail <> coalesce(t.waitlist_tail, 0)"
+        ))
+        await conn.execute(text(f"DROP TABLE {waitlist}, {tails}"))
+    async with engines.session_factory() as db:
+        await recount_seats(db)
+        await db.commit()
+
+
+@dataclass
+class Case:
+    """One route: `request(i)` returns the httpx.request arguments, `collect` keeps what write routes return."""
+    route: str
+    method: str
+    request: Callable[[int], dict]
+    collect: Optional[Callable[[httpx.Response], None]] = None
+
+    @property
+    def read_only(self) -> bool:
+        return self.method == "GET"
+
+
+def _pick(items: list, i: int):
+    return items[i % len(items)]
+
+
+def _import_csv(tag: str, i: int, rows: int = 100) -> str:
+    lines = ["first_name,last_name,email,phone"]
+    lines += [f"Import,{n},bench-{tag}-import-{i}-{n}@bench.example,+1 555 {n:07d}" for n in range(rows - 1)]
+    lines.append("Broken,Row,not-an-email,")
+    return "\n".join(lines) + "\n"
+
+
+def build_cases(f: Fixtures) -> List[Case]:
+    created = f.created
+    tag = f.tag
+
+    def keep(kind: str, key: str = "id"):
+        def collect(response: httpx.Response) -> None:
+            if response.status_code in (200, 201):
+                created[kind].append(response.json()[key])
+        return collect
+
+    def keep_import(response: httpx.Response) -> None:
+        url = response.json().get("error_report_url") if response.status_code == 200 else None
+        if url:
+            created["imports"].append(httpx.URL(url).path)
+
+    return [
+        # CATEGORIES
+        Case("/categories", "GET", lambda i: {"url": "/categories"}),
+        Case("/categories", "POST", lambda i: {
+            "url": "/categories", "json": {"name": f"bench-{tag}-{i}", "description": "Benchmark"},
+        }, keep("categories")),
+        Case("/categories/{category_id}", "PUT", lambda i: {
+            "url": f"/categories/{_pick(created['categories'], i)}",
+            "json": {"name": f"bench-{tag}-renamed-{i}", "description": f"Updated {i}"},
+        }),
+        # EVENTS
+        Case("/events", "GET", lambda i: {"url": "/events", "params": {"category_id": _pick(f.categories, i)}}),
+        Case("/events?fields", "GET", lambda i: {"url": "/events", "params": {"fields": "id,title,start_date"}}),
+        Case("/events?sort=title", "GET", lambda i: {"url": "/events", "params": {"sort": "title", "cursor": ""}}),
+        Case("/events/search", "GET", lambda i: {
+            "url": "/events/search", "params": {"q": _pick(["python workshop", "music", "cloud -meetup"], i)},
+        }),
+        Case("/events?mode=overlaps", "GET", lambda i: {"url": "/events", "params": {
+            "start_date": f"2025-{i % 12 + 1:02d}-01T00:00:00+00:00",
+            "end_date": f"2025-{i % 12 + 1:02d}-28T23:59:59+00:00",
+            "mode": "overlaps",
+        }}),
+        Case("/events", "POST", lambda i: {"url": "/events", "json": {
+            "title": f"bench-{tag}-{i} Benchmark Launch",
+            "start_date": "2031-01-01T09:00:00+00:00",
+            "end_date": "2031-01-01T17:00:00+00:00",
+            "max_capacity": 100,
+            "category_id": _pick(f.categories, i),
+        }}, keep("events")),
+        Case("/events/{event_id}", "GET", lambda i: {"url": f"/events/{_pick(f.events, i)}"}),
+        Case("/events/{event_id}", "PUT", lambda i: {
+            "url": f"/events/{_pick(created['events'], i)}", "json": {"description": f"Updated {i}"},
+        }),
+        Case("/events/{event_id}/attendees", "GET", lambda i: {"url": f"/events/{_pick(f.events, i)}/attendees"}),
+        # ATTENDEES
+        Case("/attendees", "GET", lambda i: {"url": "/attendees", "params": {"limit": 100}}),
+        Case("/attendees?search", "GET", lambda i: {"url": "/attendees", "params": {"search": _pick(f.searches, i)}}),
+        Case("/attendees", "POST", lambda i: {"url": "/attendees", "json": {
+            "first_name": "Bench", "last_name": str(i), "email": f"bench-{tag}-{i}@bench.example",
+            "phone": f"+1 555 {i:07d}",
+        }}, keep("attendees")),
+        Case("/attendees/import", "POST", lambda i: {
+            "url": "/attendees/import", "content": _import_csv(tag, i), "headers": {"content-type": "text/csv"},
+        }, keep_import),
+        Case("/attendees/import/{import_id}/errors", "GET", lambda i: {"url": _pick(created["imports"], i)}),
+        Case("/attendees/{attendee_id}", "GET", lambda i: {"url": f"/attendees/{_pick(f.attendees, i)}"}),
+        # REGISTRATIONS
+        Case("/registrations", "GET", lambda i: {"url": "/registrations"}),
+        Case("/registrations?event_id", "GET", lambda i: {
+            "url": "/registrations", "params": {"event_id": _pick(f.events, i), "cursor": ""},
+        }),
+        Case("/registrations?stream", "GET", lambda i: {
+            "url": "/registrations", "params": {"event_id": _pick(f.events, i), "stream": "true"},
+        }),
+        Case("/registrations?status", "GET", lambda i: {
+            "url": "/registrations", "params": {"status": "waitlisted", "created_from": "2024-09-01T00:00:00+00:00"},
+        }),
+        Case("/registrations/export", "GET", lambda i: {
+            "url": "/registrations/export", "params": {"event_id": _pick(f.events, i)},
+        }),
+        Case("/registrations", "POST", lambda i: {"url": "/registrations", "json": {
+            "event_id": _pick(f.events, i), "attendee_id": _pick(created["attendees"], i),
+        }}, keep("registrations")),
+        Case("/registrations/bulk", "POST", lambda i: {"url": "/registrations/bulk", "json": {"items": [
+            {"event_id": _pick(f.events, i + n + 1), "attendee_id": _pick(created["attendees"], n)}
+            for n in range(min(100, len(created["attendees"])))
+        ]}}),
+        Case("/registrations/{registration_id}/waitlist", "GET", lambda i: {
+            "url": f"/registrations/{_pick(f.waitlisted or f.registrations, i)}/waitlist",
+        }),
+        Case("/registrations/{registration_id}", "GET", lambda i: {"url": f"/registrations/{_pick(f.registrations, i)}"}),
+        Case("/registrations/{registration_id}", "PATCH", lambda i: {
+            "url": f"/registrations/{_pick(created['registrations'], i)}", "json": {"status": "confirmed"},
+        }),
+        Case("/registrations/{registration_id}", "DELETE", lambda i: {
+            "url": f"/registrations/{created['registrations'][i]}",
+        }),
+        # LAST: DELETES THE CATEGORIES CREATED ABOVE
+        Case("/categories/{category_id}", "DELETE", lambda i: {"url": f"/categories/{created['categories'][i]}"}),
+    ]
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def run_case(client: httpx.AsyncClient, case: Case, requests: int, concurrency: int, warmup: int) -> dict:
+    if case.read_only:
+        for i in range(warmup):
+            try:
+                kwargs = case.request(i)
+            except (IndexError, ZeroDivisionError):
+                break
+            await client.request(case.method, **kwargs)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    queries: List[int] = []
+    statuses: Counter = Counter()
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            try:
+                kwargs = case.request(i)
+            except (IndexError, ZeroDivisionError):
+                # A WRITE ROUTE EARLIER IN THE RUN PRODUCED FEWER ROWS THAN REQUESTED
+                statuses["skipped"] += 1
+                return
+            started = time.perf_counter()
+            response = await client.request(case.method, **kwargs)
+            await response.aread()
+            latencies.append(time.perf_counter() - started)
+            statuses[str(response.status_code)] += 1
+            queries.append(int(response.headers.get("x-query-count", 0)))
+            if case.collect is not None:
+                case.collect(response)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - started
+
+    ordered = sorted(latencies)
+    return {
+        "route": case.route,
+        "method": case.method,
+        "requests": len(latencies),
+        "statuses": dict(statuses),
+        "p50_ms": round(_percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(_percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(_percentile(ordered, 99) * 1000, 2),
+        "throughput_rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "queries_per_request": round(sum(queries) / len(queries), 2) if queries else 0.0,
+    }
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_table(results: List[dict]) -> None:
+    print(f"{'route':<46}{'p50':>9}{'p95':>9}{'p99':>9}{'req/s':>9}{'queries':>9}  statuses")
+    for r in results:
+        print(
+            f"{r['method'] + ' ' + r['route']:<46}{r['p50_ms']:>9.1f}{r['p95_ms']:>9.1f}{r['p99_ms']:>9.1f}"
+            f"{r['throughput_rps']:>9.0f}{r['queries_per_request']:>9.1f}  {r['statuses']}"
+        )
+
+
+async def main(args) -> None:
+    async with app.router.lifespan_context(app):
+        # ONE ACCESS LOG LINE PER BENCHMARK REQUEST WOULD DROWN THE REPORT
+        logging.getLogger("src.access").setLevel(logging.WARNING)
+        if args.seed:
+            print(f"Seeding the {args.scale} scale ...")
+            await generate(engines.primary, SCALES[args.scale])
+        fixtures = await load_fixtures(sample=max(args.requests, 200))
+        routes = set(args.routes.split(",")) if args.routes else None
+
+        results = []
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                for case in build_cases(fixtures):
+                    if routes and case.route not in routes:
+                        continue
+                    results.append(await run_case(client, case, args.requests, args.concurrency, args.warmup))
+        finally:
+            await cleanup(fixtures)
+
+    print_table(results)
+    report = {
+        "commit": _git_commit(),
+        "scale": args.scale,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "python": platform.python_version(),
+        "finished_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "results": results,
+    }
+    output = args.output or f"bench-{args.scale}-{report['commit'] or 'worktree'}.json"
+    with open(output, "w") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--seed", action="store_true", help="Wipe the tables and load the chosen scale first")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per route")
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests before each read route")
+    parser.add_argument("--routes", help="Comma-separated route templates to run (default: all)")
+    parser.add_argument("--output", help="JSON results file (default: bench-<scale>-<commit>.json)")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args)))
@@ -0,0 +1,89 @@
+# THROUGHPUT OF THE EVENTS HANDLERS AS async def ON AsyncSession VERSUS THE OLD sync def / THREADPOOL MODEL.
+#
+# 1. MODEL: TWO MINIMAL APPS WITH THE SAME SIMULATED DATABASE ROUND TRIP. ONE AWAITS IT ON THE EVENT LOOP,
+#    THE OTHER BLOCKS A STARLETTE THREADPOOL WORKER (CAPPED AT 40 BY ANYIO'S DEFAULT LIMITER) FOR IT.
+#    THIS ISOLATES THE CONCURRENCY MODEL FROM THE DRIVER.
+# 2. LIVE (--live): THE REAL GET /events/{event_id} AND GET /events/{event_id}/attendees ROUTES AGAINST THE
+#    DATABASE IN DATABASE_URL, USING THE FIRST EVENT FOUND.
+#
+# To run: python -m benchmarks.events_concurrency --latency-ms 5 --requests 2000 --concurrency 10,100,400 [--live]
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+
+def _model_apps(latency: float) -> dict:
+    async_app = FastAPI()
+    threadpool_app = FastAPI()
+
+    @async_app.get("/events/{event_id}")
+    async def async_handler(event_id: str):
+        await asyncio.sleep(latency)
+        return {"id": event_id}
+
+    @threadpool_app.get("/events/{event_id}")
+    def threadpool_handler(event_id: str):
+        time.sleep(latency)
+        return {"id": event_id}
+
+    return {"async def (AsyncSession)": async_app, "def (threadpool)": threadpool_app}
+
+
+async def _drive(app, paths: list, requests: int, concurrency: int) -> tuple:
+    transport = httpx.ASGITransport(app=app)
+    semaphore = asyncio.Semaphore(concurrency)
+    failures = 0
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one(i: int) -> None:
+            nonlocal failures
+            async with semaphore:
+                response = await client.get(paths[i % len(paths)])
+                if response.status_code != 200:
+                    failures += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(requests)))
+        elapsed = time.perf_counter() - started
+    return requests / elapsed, failures
+
+
+async def _live_paths() -> list:
+    from sqlalchemy import text
+    from src.database import engines
+
+    async with engines.primary.connect() as conn:
+        event_id = (await conn.execute(text("SELECT id FROM events LIMIT 1"))).scalar_one_or_none()
+    if event_id is None:
+        raise SystemExit("No events in the database; run python -m src.db.seed first")
+    return [f"/events/{event_id}", f"/events/{event_id}/attendees"]
+
+
+async def main(latency_ms: float, requests: int, levels: list, live: bool) -> None:
+    print(f"{'model':<28}{'concurrency':>12}{'req/s':>12}{'failed':>8}")
+    for name, app in _model_apps(latency_ms / 1000).items():
+        for concurrency in levels:
+            rate, failures = await _drive(app, ["/events/1"], requests, concurrency)
+            print(f"{name:<28}{concurrency:>12}{rate:>12.0f}{failures:>8}")
+
+    if live:
+        from src.main import app
+
+        async with app.router.lifespan_context(app):
+            paths = await _live_paths()
+            for concurrency in levels:
+                rate, failures = await _drive(app, paths, requests, concurrency)
+                print(f"{'live events router':<28}{concurrency:>12}{rate:>12.0f}{failures:>8}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Simulated database round trip")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", default="10,100,400")
+    parser.add_argument("--live", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.latency_ms, args.requests, [int(c) for c in args.concurrency.split(",")], args.live))
@@ -0,0 +1,213 @@
+# QUERY-PLAN REGRESSION CHECK. SENDS A FEW REQUESTS TO EVERY ROUTE OF THE FOUR ROUTERS (THE SAME CASES AS
+# benchmarks.endpoints), RECORDS EVERY SQL STATEMENT EACH ROUTE EMITS, AND RUNS EXPLAIN (FORMAT JSON) ON IT AGAINST
+# THE SEEDED DATABASE IN DATABASE_URL. IT FAILS (EXIT 1) WHEN
+#   - A PLAN SEQUENTIALLY SCANS A LARGE TABLE (reltuples >= --large-rows) THAT THE BASELINE DOES NOT ALLOW, OR
+#   - A PLAN'S ESTIMATED TOTAL COST EXCEEDS ITS BASELINE COST BY MORE THAN --factor.
+# STATEMENTS ARE KEYED BY ROUTE AND A HASH OF THEIR PARAMETERIZED SQL, SO A CHANGED QUERY SHOWS UP AS NEW.
+#
+# THE BASELINE (benchmarks/plan_baseline.json) IS WRITTEN BY --update-baseline; REVIEW AND COMMIT IT WITH THE
+# CHANGE THAT MOVED THE PLANS. WITHOUT IT THE CHECK FAILS: THERE IS NOTHING TO COMPARE AGAINST. ESTIMATES DEPEND ON
+# THE DATA, SO THE BASELINE RECORDS ITS --scale AND A CHECK AT ANY OTHER SCALE FAILS TOO. TAKE IT FROM A FRESH
+# --seed (THE GENERATOR'S FIXED SEED MAKES THAT DATA IDENTICAL EVERYWHERE). THE REQUESTS USE A STABLE SAMPLE OF
+# THE DATA (load_fixtures(stable=True)), SO EVERY RUN EXPLAINS THE SAME STATEMENTS WITH THE SAME PARAMETERS.
+#
+# To run: python -m benchmarks.plan_check --scale medium --seed [--update-baseline]
+# tests/test_plan_check.py RUNS THE SAME CHECK UNDER pytest WHEN DATABASE_URL HOLDS THE BASELINE'S SCALE.
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import sys
+from pathlib import Path
+from typing import Dict, Optional
+
+import httpx
+from sqlalchemy import event, text
+
+from benchmarks.endpoints import SCALES, build_cases, cleanup, load_fixtures
+from src.database import engines
+from src.db.generate import generate
+from src.main import app
+
+BASELINE = Path(__file__).parent / "plan_baseline.json"
+EXPLAINABLE = ("select", "with", "insert", "update", "delete")
+
+
+class Recorder:
+    """Cursor listener collecting the distinct statements emitted while a route is being exercised."""
+
+    def __init__(self):
+        self.route: Optional[str] = None
+        self.statements: Dict[str, dict] = {}
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        if self.route is None or not statement.lstrip().lower().startswith(EXPLAINABLE):
+            return
+        sql = " ".join(statement.split())
+        key = f"{self.route} #{hashlib.sha1(sql.encode()).hexdigest()[:12]}"
+        if key not in self.statements:
+            self.statements[key] = {
+                "sql": sql,
+                "statement": statement,
+                "parameters": parameters[0] if executemany and parameters else parameters,
+            }
+
+
+def _walk(node: dict):
+    yield node
+    for child in node.get("Plans", []):
+        yield from _walk(child)
+
+
+async def _large_tables(minimum_rows: int) -> set:
+    async with engines.primary.connect() as conn:
+        rows = await conn.execute(text(
+            "SELECT relname FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace "
+            "AND reltuples >= :n"
+        ), {"n": minimum_rows})
+        return {row[0] for row in rows}
+
+
+async def _settle() -> None:
+    # THE RECORDED REQUESTS WROTE TO THE TABLES. CLEAR THE DEAD ROWS AND GIN PENDING LISTS THEY LEFT (BOTH RAISE
+    # ESTIMATED COSTS) AND REFRESH THE STATISTICS, SO EVERY RUN EXPLAINS AGAINST THE SAME STEADY STATE
+    async with engines.primary.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        await conn.execute(text("VACUUM ANALYZE categories, events, attendees, registrations"))
+
+
+async def explain(statement: str, parameters) -> dict:
+    args = list(parameters.values()) if isinstance(parameters, dict) else list(parameters or ())
+    async with engines.primary.connect() as conn:
+        driver = (await conn.get_raw_connection()).driver_connection
+        plan = await driver.fetchval(f"EXPLAIN (FORMAT JSON) {statement}", *args)
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+
+
+async def capture(requests: int) -> Dict[str, dict]:
+    fixtures = await load_fixtures(sample=200, stable=True)
+    recorder = Recorder()
+    for engine in engines.engines.values():
+        event.listen(engine.sync_engine, "before_cursor_execute", recorder)
+    transport = httpx.ASGITransport(app=app)
+    try:
+        async with httpx.AsyncClient(transport=transport, base_url="http://plans", timeout=None) as client:
+            for case in build_cases(fixtures):
+                recorder.route = f"{case.method} {case.route}"
+                for i in range(requests):
+                    try:
+                        kwargs = case.request(i)
+                    except (IndexError, ZeroDivisionError):
+                        break
+                    response = await client.request(case.method, **kwargs)
+                    if case.collect is not None:
+                        case.collect(response)
+                recorder.route = None
+    finally:
+        for engine in engines.engines.values():
+            event.remove(engine.sync_engine, "before_cursor_execute", recorder)
+        await cleanup(fixtures)
+    return recorder.statements
+
+
+async def seeded_scale() -> Optional[str]:
+    """The SCALES entry whose row counts the database in DATABASE_URL holds, or None."""
+    async with engines.primary.connect() as conn:
+        counts = (await conn.execute(text(
+            "SELECT (SELECT count(*) FROM categories), (SELECT count(*) FROM events), "
+            "(SELECT count(*) FROM attendees), (SELECT count(*) FROM registrations)"
+        ))).one()
+    for name, options in SCALES.items():
+        if tuple(counts) == (options.categories, options.events, options.attendees, options.registrations):
+            return name
+    return None
+
+
+def load_baseline(args) -> Optional[dict]:
+    """The baseline plans to check against ({} when updating), or None when there is no usable baseline."""
+    if args.update_baseline:
+        return {}
+    if not BASELINE.exists():
+        print(f"No baseline at {BASELINE}; create one with --seed --update-baseline and commit it")
+        return None
+    recorded = json.loads(BASELINE.read_text())
+    if recorded.get("scale") != args.scale:
+        print(f"The baseline was taken at the {recorded.get('scale')} scale, not {args.scale}")
+        return None
+    return recorded["plans"]
+
+
+async def check(args, baseline: dict) -> bool:
+    statements = await capture(args.requests)
+    await _settle()
+    large = await _large_tables(args.large_rows)
+    current, failures = {}, []
+
+    for key, captured in sorted(statements.items()):
+        try:
+            plan = await explain(captured["statement"], captured["parameters"])
+        except Exception as error:
+            # E.G. STATEMENTS ON TEMP TABLES THAT ONLY EXISTED INSIDE THE REQUEST'S TRANSACTION
+            print(f"SKIP  {key}: {str(error).splitlines()[0]}")
+            continue
+
+        seq_scans = sorted({
+            node["Relation Name"] for node in _walk(plan)
+            if node["Node Type"] == "Seq Scan" and node.get("Relation Name") in large
+        })
+        cost = plan["Total Cost"]
+        known = baseline.get(key, {})
+        current[key] = {
+            "statement": captured["sql"],
+            "total_cost": cost,
+            "allowed_seq_scans": seq_scans if args.update_baseline else known.get("allowed_seq_scans", []),
+        }
+
+        problems = []
+        new_scans = [name for name in seq_scans if name not in known.get("allowed_seq_scans", [])]
+        if new_scans and not args.update_baseline:
+            problems.append(f"sequential scan on {', '.join(new_scans)}")
+        if known.get("total_cost") and cost > known["total_cost"] * args.factor and not args.update_baseline:
+            problems.append(f"cost {cost:.0f} > {args.factor}x baseline {known['total_cost']:.0f}")
+
+        label = "FAIL" if problems else ("NEW " if not known else "ok  ")
+        print(f"{label}  {key}  cost={cost:.0f}  {'; '.join(problems)}")
+        if problems:
+            print(f"      {captured['sql'][:200]}")
+            failures.append(key)
+
+    if args.update_baseline:
+        BASELINE.write_text(json.dumps({"scale": args.scale, "plans": current}, indent=2, sort_keys=True) + "\n")
+        print(f"Wrote {len(current)} plans to {BASELINE}")
+        return True
+
+    gone = sorted(set(baseline) - set(current))
+    for key in gone:
+        print(f"GONE  {key}")
+    print(f"{len(current)} statements, {len(failures)} regressions")
+    return not failures
+
+
+async def main(args) -> bool:
+    baseline = load_baseline(args)
+    if baseline is None:
+        return False
+    async with app.router.lifespan_context(app):
+        logging.getLogger("src.access").setLevel(logging.WARNING)
+        if args.seed:
+            print(f"Seeding the {args.scale} scale ...")
+            await generate(engines.primary, SCALES[args.scale])
+        return await check(args, baseline)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scale", choices=sorted(SCALES), default="medium")
+    parser.add_argument("--seed", action="store_true", help="Wipe the tables and load the chosen scale first")
+    parser.add_argument("--requests", type=int, default=3, help="Requests per route while recording statements")
+    parser.add_argument("--large-rows", type=int, default=10_000, help="Tables with at least this many rows are large")
+    parser.add_argument("--factor", type=float, default=2.0, help="Allowed growth of estimated cost over the baseline")
+    parser.add_argument("--update-baseline", action="store_true", help="Record the current plans as the baseline")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(main(args)) else 1)
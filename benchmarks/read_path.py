@@ -0,0 +1,79 @@
+# READ-PATH BENCHMARK: CPU TIME AND PEAK PYTHON MEMORY TO LOAD --rows ROWS FROM THE DATABASE IN DATABASE_URL AND
+# ENCODE THEM AS A JSON BODY, FOR THE STATEMENTS BEHIND THE FOUR LIST ROUTES, ALONG TWO PATHS:
+#   orm    select(Model): FULL ORM INSTANCES IN THE SESSION IDENTITY MAP (THE OLD ROUTE CODE)
+#   core   select_for(Model, field_names(Schema)): ONLY THE SCHEMA'S COLUMNS, WRAPPED IN SLOTTED RECORDS (src/records.py)
+# BOTH ENCODE WITH src.serialization.dump_json. CPU IS process_time() OF THE WHOLE REQUEST-EQUIVALENT, SO IT
+# INCLUDES asyncpg DECODING; MEMORY IS THE tracemalloc PEAK. THE TABLES NEED AT LEAST --rows ROWS (SEED FIRST).
+#
+# To run: python -m benchmarks.read_path --rows 10000 --repeat 5
+import argparse
+import asyncio
+import time
+import tracemalloc
+from typing import Callable, List
+
+from sqlalchemy import select
+
+from src.database import engines
+from src.main import app
+from src.models import models
+from src.records import field_names, records, select_for
+from src.schemas import Attendee, Registration
+from src.schemas.event import Event
+from src.serialization import dump_json
+
+CASES = [
+    ("list_events", models.Event, Event, lambda query: query.order_by(models.Event.start_date, models.Event.id)),
+    ("list_attendees", models.Attendee, Attendee, lambda query: query.order_by(models.Attendee.created_at, models.Attendee.id)),
+    ("list_registrations", models.Registration, Registration,
+     lambda query: query.order_by(models.Registration.created_at, models.Registration.id)),
+    ("list_event_attendees", models.Attendee, Attendee,
+     lambda query: query.join(models.Registration).order_by(models.Registration.event_id)),
+]
+
+
+async def _orm(model, schema, shape, rows: int) -> bytes:
+    async with engines.read_session_factory(bind=engines.primary) as session:
+        result = await session.execute(shape(select(model)).limit(rows))
+        return dump_json(result.scalars().all(), List[schema])
+
+
+async def _core(model, schema, shape, rows: int) -> bytes:
+    async with engines.read_session_factory(bind=engines.primary) as session:
+        names = field_names(schema)
+        result = await session.execute(shape(select_for(model, names)).limit(rows))
+        return dump_json(records(result, names), List[schema])
+
+
+async def _measure(path: Callable, args: tuple, repeat: int) -> tuple:
+    await path(*args)  # WARM UP: STATEMENT CACHE, PREPARED STATEMENTS, SCHEMA COMPILATION
+    cpu = float("inf")
+    for _ in range(repeat):
+        started = time.process_time()
+        await path(*args)
+        cpu = min(cpu, time.process_time() - started)
+    tracemalloc.start()
+    await path(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return cpu * 1000, peak / 2 ** 20
+
+
+async def main(args) -> None:
+    async with app.router.lifespan_context(app):
+        print(f"{args.rows} rows per statement, best of {args.repeat}")
+        print(f"{'statement':<22}{'orm ms':>9}{'core ms':>9}{'saved':>8}{'orm MiB':>10}{'core MiB':>10}{'saved':>8}")
+        for name, model, schema, shape in CASES:
+            orm_cpu, orm_mem = await _measure(_orm, (model, schema, shape, args.rows), args.repeat)
+            core_cpu, core_mem = await _measure(_core, (model, schema, shape, args.rows), args.repeat)
+            print(
+                f"{name:<22}{orm_cpu:>9.1f}{core_cpu:>9.1f}{(1 - core_cpu / orm_cpu) * 100:>7.0f}%"
+                f"{orm_mem:>10.1f}{core_mem:>10.1f}{(1 - core_mem / orm_mem) * 100:>7.0f}%"
+            )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,106 @@
+# RESPONSE SERIALIZATION MICROBENCHMARK: CPU TIME TO TURN --items ORM INSTANCES OF EACH RESPONSE SCHEMA INTO A JSON
+# BODY ALONG THREE PATHS, NO DATABASE OR HTTP INVOLVED:
+#   fastapi+json    FastAPI'S response_model PATH (VALIDATE, DUMP TO PYTHON) AND THE STOCK JSONResponse
+#   fastapi+orjson  THE SAME WITH ORJSONResponse, THE APP'S DEFAULT RESPONSE CLASS FOR ROUTES OFF THE FAST PATH
+#   fast path       src.serialization.dump_json: ONE PRECOMPILED TypeAdapter VALIDATES AND WRITES JSON BYTES
+# "Category (serializer)" IS THE Category SCHEMA WITH THE PER-FIELD PYTHON field_serializer IT USED TO HAVE.
+#
+# To run: python -m benchmarks.serialization --items 10000 --repeat 5
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from pydantic import field_serializer
+
+from src.models import models
+from src.schemas import Attendee, Category, Registration
+from src.schemas.event import Event
+from src.serialization import dump_json
+
+
+class _SerializedCategory(Category):
+    @field_serializer("created_at", "updated_at")
+    def serialize_datetime(self, dt: datetime) -> str:
+        return dt.isoformat()
+
+
+def _rows(count: int) -> dict:
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    stamps = {"created_at": now, "updated_at": now}
+    category_id = uuid.uuid4()
+    categories = [
+        models.Category(id=uuid.uuid4(), name=f"Category {i}", description="Benchmark category", **stamps)
+        for i in range(count)
+    ]
+    events = [
+        models.Event(
+            id=uuid.uuid4(), title=f"Python Conference {i}", description="A conference about Python. " * 8,
+            start_date=now + timedelta(days=i % 365), end_date=now + timedelta(days=i % 365, hours=8),
+            location="Lagos", max_capacity=500, is_active=True, category_id=category_id, **stamps,
+        )
+        for i in range(count)
+    ]
+    attendees = [
+        models.Attendee(
+            id=uuid.uuid4(), first_name="Ada", last_name="Okafor", email=f"ada.okafor.{i}@example.com",
+            phone=f"+1 555 {i:07d}", **stamps,
+        )
+        for i in range(count)
+    ]
+    registrations = [
+        models.Registration(
+            id=uuid.uuid4(), event_id=category_id, attendee_id=uuid.uuid4(), status="registered",
+            registration_date=now, **stamps,
+        )
+        for i in range(count)
+    ]
+    return {
+        "Event": (Event, events),
+        "Attendee": (Attendee, attendees),
+        "Registration": (Registration, registrations),
+        "Category": (Category, categories),
+        "Category (serializer)": (_SerializedCategory, categories),
+    }
+
+
+def _fastapi(schema, response_class) -> Callable[[list], bytes]:
+    field = create_model_field("Response", List[schema], mode="serialization")
+
+    def render(rows: list) -> bytes:
+        content = asyncio.run(serialize_response(field=field, response_content=rows))
+        return response_class(content).body
+    return render
+
+
+def _cpu_ms(render: Callable[[list], bytes], rows: list, repeat: int) -> float:
+    render(rows[:10])  # WARM UP: SCHEMA COMPILATION IS NOT PART OF THE PER-REQUEST COST
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.process_time()
+        render(rows)
+        best = min(best, time.process_time() - started)
+    return best * 1000
+
+
+def main(args) -> None:
+    print(f"CPU ms to serialize {args.items} items (best of {args.repeat})")
+    print(f"{'schema':<24}{'fastapi+json':>14}{'fastapi+orjson':>16}{'fast path':>12}{'saved':>10}")
+    for name, (schema, rows) in _rows(args.items).items():
+        default = _cpu_ms(_fastapi(schema, JSONResponse), rows, args.repeat)
+        orjson = _cpu_ms(_fastapi(schema, ORJSONResponse), rows, args.repeat)
+        fast = _cpu_ms(lambda items: dump_json(items, List[schema]), rows, args.repeat)
+        saved = f"{(1 - fast / default) * 100:.0f}%"
+        print(f"{name:<24}{default:>14.1f}{orjson:>16.1f}{fast:>12.1f}{saved:>10}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    main(parser.parse_args())
@@ -0,0 +1,75 @@
+"""registration waitlist sequence
+
+Revision ID: 182054463b66
+Revises: 9fcc778d0474
+Create Date: 2026-10-18 02:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '182054463b66'
+down_revision: Union[str, None] = '9fcc778d0474'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # events.waitlist_tail IS THE LAST QUEUE NUMBER HANDED OUT FOR THE EVENT; registrations.waitlist_seq IS A
+    # WAITLISTED REGISTRATION'S NUMBER IN ITS EVENT'S QUEUE (NULL FOR EVERY OTHER STATUS)
+    op.add_column('events', sa.Column('waitlist_tail', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('registrations', sa.Column('waitlist_seq', sa.BigInteger(), nullable=True))
+    # NUMBER THE EXISTING QUEUES 1..n IN THEIR FIFO (created_at, id) ORDER
+    op.execute(
+        """
+        UPDATE registrations SET waitlist_seq = queued.seq
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY event_id ORDER BY created_at, id) AS seq
+            FROM registrations WHERE status = 'waitlisted'
+        ) AS queued
+        WHERE queued.id = registrations.id
+        """
+    )
+    op.execute(
+        """
+        UPDATE events SET waitlist_tail = queued.tail
+        FROM (
+            SELECT event_id, max(waitlist_seq) AS tail FROM registrations
+            WHERE status = 'waitlisted'
+            GROUP BY event_id
+        ) AS queued
+        WHERE queued.event_id = events.id
+        """
+    )
+    op.create_check_constraint(
+        'ck_registrations_waitlist_seq', 'registrations', "(status = 'waitlisted') = (waitlist_seq IS NOT NULL)"
+    )
+    # THE QUEUE ORDER IS NOW waitlist_seq: THE NEW INDEX REPLACES THE (event_id, created_at, id) ONE
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_registrations_waitlist_seq', 'registrations', ['event_id', 'waitlist_seq'],
+            postgresql_where=sa.text("status = 'waitlisted'"), postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_registrations_waitlist', table_name='registrations', postgresql_concurrently=True, if_exists=True
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_registrations_waitlist', 'registrations', ['event_id', 'created_at', 'id'],
+            postgresql_where=sa.text("status = 'waitlisted'"), postgresql_concurrently=True, if_not_exists=True,
+        )
+        op.drop_index(
+            'ix_registrations_waitlist_seq', table_name='registrations', postgresql_concurrently=True, if_exists=True
+        )
+    op.drop_constraint('ck_registrations_waitlist_seq', 'registrations', type_='check')
+    op.drop_column('registrations', 'waitlist_seq')
+    op.drop_column('events', 'waitlist_tail')
@@ -0,0 +1,47 @@
+"""attendee trigram search
+
+Revision ID: 67880278afd9
+Revises: 8d22c17d6d80
+Create Date: 2026-10-17 21:45:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '67880278afd9'
+down_revision: Union[str, None] = '8d22c17d6d80'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    op.add_column(
+        'attendees',
+        sa.Column(
+            'phone_digits',
+            sa.String(length=20),
+            sa.Computed("regexp_replace(phone, '[^0-9]', '', 'g')", persisted=True),
+            nullable=True,
+        ),
+    )
+    op.create_index(
+        'ix_attendees_email_trgm', 'attendees', ['email'],
+        postgresql_using='gin', postgresql_ops={'email': 'gin_trgm_ops'},
+    )
+    op.create_index(
+        'ix_attendees_phone_digits_trgm', 'attendees', ['phone_digits'],
+        postgresql_using='gin', postgresql_ops={'phone_digits': 'gin_trgm_ops'},
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_attendees_phone_digits_trgm', table_name='attendees')
+    op.drop_index('ix_attendees_email_trgm', table_name='attendees')
+    op.drop_column('attendees', 'phone_digits')
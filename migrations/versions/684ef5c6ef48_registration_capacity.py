@@ -0,0 +1,46 @@
+"""registration capacity
+
+Revision ID: 684ef5c6ef48
+Revises: 1925f820f1e9
+Create Date: 2026-10-17 22:15:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '684ef5c6ef48'
+down_revision: Union[str, None] = '1925f820f1e9'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        'events',
+        sa.Column('seats_taken', sa.Integer(), server_default='0', nullable=False),
+    )
+    op.execute(
+        """
+        UPDATE events SET seats_taken = held.n
+        FROM (
+            SELECT event_id, count(*) AS n FROM registrations
+            WHERE status IN ('registered', 'confirmed')
+            GROUP BY event_id
+        ) AS held
+        WHERE held.event_id = events.id
+        """
+    )
+    op.create_unique_constraint(
+        'uq_registrations_event_attendee', 'registrations', ['event_id', 'attendee_id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_registrations_event_attendee', 'registrations', type_='unique')
+    op.drop_column('events', 'seats_taken')
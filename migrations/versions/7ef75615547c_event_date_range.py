@@ -0,0 +1,48 @@
+"""event date range
+
+Revision ID: 7ef75615547c
+Revises: 65cb82933b74
+Create Date: 2026-10-18 00:20:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7ef75615547c'
+down_revision: Union[str, None] = '65cb82933b74'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # A STORED GENERATED COLUMN REWRITES events UNDER AN EXCLUSIVE LOCK; THE INDEX IS THEN BUILT WITHOUT ONE
+    op.add_column(
+        'events',
+        sa.Column(
+            'during',
+            postgresql.TSTZRANGE(),
+            sa.Computed(
+                "tstzrange(least(start_date, end_date), greatest(start_date, end_date), '[]')",
+                persisted=True,
+            ),
+            nullable=True,
+        ),
+    )
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_events_during', 'events', ['during'],
+            postgresql_using='gist', postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_events_during', table_name='events', postgresql_concurrently=True, if_exists=True)
+    op.drop_column('events', 'during')
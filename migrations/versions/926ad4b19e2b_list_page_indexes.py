@@ -0,0 +1,43 @@
+"""list page indexes
+
+Revision ID: 926ad4b19e2b
+Revises: 7ef75615547c
+Create Date: 2026-10-18 00:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '926ad4b19e2b'
+down_revision: Union[str, None] = '7ef75615547c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (NAME, TABLE, COLUMNS, EXTRA create_index ARGUMENTS)
+INDEXES = [
+    ('ix_events_created_at_id', 'events', ['created_at', 'id'], {}),
+    ('ix_events_title_id', 'events', ['title', 'id'], {}),
+    ('ix_registrations_created_at_id', 'registrations', ['created_at', 'id'], {}),
+    ('ix_registrations_event_id_created_at_id', 'registrations', ['event_id', 'created_at', 'id'], {}),
+    ('ix_registrations_status_created_at_id', 'registrations', ['status', 'created_at', 'id'], {}),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # BUILT CONCURRENTLY, OUTSIDE A TRANSACTION, AS IN 65cb82933b74 (WHICH ALSO HOLDS THE (start_date, id) AND
+    # attendee_id KEYSET INDEXES THESE LIST ORDERS USE)
+    with op.get_context().autocommit_block():
+        for name, table, columns, extra in INDEXES:
+            op.create_index(name, table, columns, postgresql_concurrently=True, if_not_exists=True, **extra)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
@@ -0,0 +1,37 @@
+"""attendee keyset index
+
+Revision ID: 9fcc778d0474
+Revises: 926ad4b19e2b
+Create Date: 2026-10-18 01:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9fcc778d0474'
+down_revision: Union[str, None] = '926ad4b19e2b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # KEYSET ORDER FOR GET /attendees. NOT PART OF THE INITIAL REVISION, SO DATABASES STAMPED AT 8d22c17d6d80
+    # GET IT TOO; if_not_exists COVERS DATABASES THAT ALREADY HAVE IT FROM init_db
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_attendees_created_at_id', 'attendees', ['created_at', 'id'],
+            postgresql_concurrently=True, if_not_exists=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_attendees_created_at_id', table_name='attendees', postgresql_concurrently=True, if_exists=True,
+        )
@@ -0,0 +1,31 @@
+"""registration waitlist index
+
+Revision ID: c555369d0318
+Revises: 684ef5c6ef48
+Create Date: 2026-10-17 22:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c555369d0318'
+down_revision: Union[str, None] = '684ef5c6ef48'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_registrations_waitlist', 'registrations', ['event_id', 'created_at', 'id'],
+        postgresql_where=sa.text("status = 'waitlisted'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_registrations_waitlist', table_name='registrations')
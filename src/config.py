@@ -2,8 +2,47 @@ from pydantic_settings import BaseSettings, SettingsConfigDict
 
 class Settings(BaseSettings):
     DATABASE_URL: str
-    print("Loading Config...")
+
+    # OPTIONAL COMMA-SEPARATED READ REPLICA URLS; READ-ONLY ROUTES ARE SPREAD OVER THEM
+    DATABASE_REPLICA_URLS: str = ""
+
+    # CONNECTION POOL (ONE PER ENGINE, PER WORKER PROCESS)
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    # PING CONNECTIONS THAT SAT IDLE LONGER THAN THIS BEFORE HANDING THEM OUT; 0 PINGS EVERY CHECKOUT, -1 NEVER
+    DB_PRE_PING_IDLE_SECONDS: float = 30.0
+
+    # LOGGING: ROOT LEVEL, PER-LOGGER OVERRIDES ("sqlalchemy.engine=INFO,src.access=WARNING") AND THE FRACTION OF
+    # SQL STATEMENTS WRITTEN TO THE src.sql LOGGER (0 NONE, 1 ALL; REPLACES ENGINE echo)
+    LOG_LEVEL: str = "INFO"
+    LOG_LEVELS: str = ""
+    SQL_LOG_SAMPLE_RATE: float = 0.0
+
+    # PER-REQUEST BUDGETS: REQUESTS OVER EITHER ONE ARE LOGGED AS WARNINGS BY QueryStatsMiddleware
+    QUERY_BUDGET: int = 20
+    LATENCY_BUDGET_MS: float = 500.0
+
+    # HARD CAP ON limit FOR THE PAGED LIST ROUTES
+    MAX_PAGE_SIZE: int = 500
+    # ROWS FETCHED, SERIALIZED AND SENT PER CHUNK BY THE STREAMED (?stream=true) LIST RESPONSES
+    STREAM_CHUNK_ROWS: int = 1000
+    # PRIMARY-POOL CONNECTIONS ALL RUNNING /registrations/export REQUESTS MAY HOLD AT ONCE (PER WORKER); KEEP IT WELL
+    # BELOW DB_POOL_SIZE + DB_MAX_OVERFLOW SO SLOW EXPORT CLIENTS CANNOT STARVE THE OTHER ROUTES
+    EXPORT_MAX_CONNECTIONS: int = 4
+    # SECONDS AN ATTENDEE-IMPORT ERROR REPORT IS KEPT ON DISK; OLDER REPORTS ARE SWEPT AT STARTUP AND ON EVERY IMPORT
+    IMPORT_REPORT_TTL_SECONDS: int = 86400
+
+    # SLOW-QUERY LOG (0 DISABLES IT): STATEMENTS AT LEAST THIS SLOW ARE KEPT, WITH THEIR PLAN, IN A RING BUFFER OF
+    # SLOW_QUERY_BUFFER ENTRIES SERVED AT /debug/slow-queries
+    SLOW_QUERY_MS: float = 200.0
+    SLOW_QUERY_BUFFER: int = 100
+    SLOW_QUERY_EXPLAIN_TIMEOUT_MS: float = 10000.0
+
+    # MOUNT /debug/pool AND /debug/slow-queries. OFF BY DEFAULT: THEY ARE UNAUTHENTICATED AND THE SLOW-QUERY LOG
+    # EXPOSES SQL TEXT, ROUTES, REQUEST IDS AND PLANS. ENABLE ONLY WHERE THE API IS NOT PUBLICLY REACHABLE.
+    DEBUG_ENDPOINTS_ENABLED: bool = False
 
     model_config = SettingsConfigDict(env_file='.env', extra='ignore')
-    print(" Config Loaded 1...2...3")
 Config = Settings()  
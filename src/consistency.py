@@ -0,0 +1,73 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import HTTPException, status
+
+# READ-YOUR-WRITES ACROSS REPLICAS. A REQUEST THAT COMMITS ON THE PRIMARY RETURNS THE PRIMARY'S WAL POSITION
+# (LSN) AFTER THE COMMIT IN THE X-Consistency-Token HEADER. A CLIENT THAT SENDS THE TOKEN BACK ON A LATER READ
+# IS ONLY SERVED BY A REPLICA THAT HAS REPLAYED AT LEAST THAT FAR; OTHERWISE THE READ GOES TO THE PRIMARY.
+# READS WITHOUT A TOKEN MAY SEE DATA AS OLD AS THE REPLICATION LAG.
+TOKEN_HEADER = "x-consistency-token"
+ROUTE_HEADER = "x-db-route"
+
+
+@dataclass
+class RequestRouting:
+    token: Optional[str] = None
+    engine: Optional[str] = None
+
+
+request_routing: ContextVar[Optional[RequestRouting]] = ContextVar("request_routing", default=None)
+
+
+def parse_lsn(lsn: str) -> int:
+    """Parse a Postgres LSN ('16/B374D848') into a comparable integer."""
+    try:
+        high, low = lsn.split("/")
+        return (int(high, 16) << 32) | int(low, 16)
+    except (AttributeError, ValueError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid consistency token")
+
+
+def note_commit(lsn: str) -> None:
+    # THE LAST COMMIT OF THE REQUEST WINS; LSNs ONLY GROW, SO IT COVERS THE EARLIER ONES TOO
+    routing = request_routing.get()
+    if routing is not None:
+        routing.token = lsn
+
+
+def note_engine(name: str) -> None:
+    routing = request_routing.get()
+    if routing is not None:
+        routing.engine = name
+
+
+class ConsistencyMiddleware:
+    """ASGI middleware returning X-Consistency-Token after writes and X-DB-Route for routed reads."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        routing = RequestRouting()
+        token = request_routing.set(routing)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                if routing.token is not None:
+                    headers.append((TOKEN_HEADER.encode(), routing.token.encode()))
+                if routing.engine is not None:
+                    headers.append((ROUTE_HEADER.encode(), routing.engine.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            request_routing.reset(token)
@@ -1,19 +1,184 @@
-from typing import AsyncGenerator
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+import itertools
+import logging
+import time
+from typing import AsyncGenerator, Dict, List, Optional
+from fastapi import Request
+from sqlalchemy import event, exc, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession
 from sqlalchemy.orm import sessionmaker
-from src.config import Config 
+from src.config import Config, Settings
+from src.consistency import TOKEN_HEADER, note_commit, note_engine, parse_lsn
+from src.instrumentation import InstrumentedAsyncQueuePool, instrument_engine
+from src.metrics import instrument_pool
 
-# Create the async engine using the DATABASE_URL from .env
-engine = create_async_engine(Config.DATABASE_URL, echo=True)
+# THE APPLICATION'S ONE ENGINE REGISTRY. ENGINES ARE BUILT FROM Settings WHEN THE APP STARTS (life_span) AND
+# DISPOSED WHEN IT STOPS, SO EACH WORKER OWNS EXACTLY ONE POOL PER DATABASE. SCRIPTS CALL start()/dispose()
+# THEMSELVES. WITH DATABASE_REPLICA_URLS SET, READ-ONLY ROUTES USE get_read_db AND ARE SPREAD OVER THE
+# REPLICAS (SEE src/consistency.py FOR THE READ-YOUR-WRITES TOKEN).
+logger = logging.getLogger(__name__)
+
+
+def _adaptive_pre_ping(engine: AsyncEngine, idle_seconds: float) -> None:
+    # PING A CONNECTION ON CHECKOUT ONLY IF IT HAS SAT IDLE IN THE POOL LONGER THAN idle_seconds. BUSY
+    # CONNECTIONS SKIP THE EXTRA ROUND TRIP THAT pool_pre_ping WOULD PAY ON EVERY CHECKOUT; STALE ONES ARE STILL
+    # CAUGHT. A FAILED PING RAISES DisconnectionError, WHICH MAKES THE POOL DISCARD THE CONNECTION AND RETRY.
+    pool = engine.sync_engine.pool
+
+    @event.listens_for(pool, "connect")
+    def on_connect(dbapi_connection, record):
+        record.info["last_used"] = time.monotonic()
+
+    @event.listens_for(pool, "checkin")
+    def on_checkin(dbapi_connection, record):
+        if record is not None:
+            record.info["last_used"] = time.monotonic()
+
+    @event.listens_for(pool, "checkout")
+    def on_checkout(dbapi_connection, record, proxy):
+        if time.monotonic() - record.info.get("last_used", 0.0) < idle_seconds:
+            return
+        try:
+            dbapi_connection.ping()
+        except Exception as error:
+            raise exc.DisconnectionError() from error
+
+
+def create_engine_from_settings(url: str, settings: Settings, name: str) -> AsyncEngine:
+    """Create an instrumented async engine with the pool settings from `settings`."""
+    engine = create_async_engine(
+        url,
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_PRE_PING_IDLE_SECONDS == 0,
+    )
+    if settings.DB_PRE_PING_IDLE_SECONDS > 0:
+        _adaptive_pre_ping(engine, settings.DB_PRE_PING_IDLE_SECONDS)
+    instrument_engine(engine)
+    instrument_pool(engine, name)
+    return engine
+
+
+class PrimarySession(AsyncSession):
+    """AsyncSession that records the primary's WAL position after each commit when replicas are configured."""
+
+    async def commit(self) -> None:
+        await super().commit()
+        if engines.replica_names:
+            # READ AFTER THE COMMIT: ANY REPLICA THAT HAS REPLAYED THIS FAR HAS THE COMMIT RECORD TOO
+            note_commit((await self.execute(text("SELECT pg_current_wal_lsn()::text"))).scalar_one())
+
+
+class EngineRegistry:
+    """Named engines plus the session factories bound to them."""
+
+    def __init__(self):
+        self.engines: Dict[str, AsyncEngine] = {}
+        self.settings: Optional[Settings] = None
+        self.session_factory: Optional[sessionmaker] = None
+        self.read_session_factory: Optional[sessionmaker] = None
+        self.replica_names: List[str] = []
+        # HIGHEST REPLAY LSN SEEN PER REPLICA. REPLAY ONLY MOVES FORWARD, SO A TOKEN AT OR BELOW IT NEEDS NO CHECK.
+        self._replayed: Dict[str, int] = {}
+        self._next_replica = None
+
+    def start(self, settings: Settings = Config) -> None:
+        if self.engines:
+            return
+        self.settings = settings
+        self.engines["primary"] = create_engine_from_settings(settings.DATABASE_URL, settings, "primary")
+        urls = [url.strip() for url in settings.DATABASE_REPLICA_URLS.split(",") if url.strip()]
+        for index, url in enumerate(urls):
+            name = f"replica-{index}"
+            self.engines[name] = create_engine_from_settings(url, settings, name)
+            self.replica_names.append(name)
+            self._replayed[name] = 0
+        self._next_replica = itertools.cycle(self.replica_names)
+        self.session_factory = sessionmaker(
+            bind=self.engines["primary"],
+            class_=PrimarySession,
+            expire_on_commit=False
+        )
+        self.read_session_factory = sessionmaker(class_=AsyncSession, expire_on_commit=False)
+
+    async def dispose(self) -> None:
+        for engine in self.engines.values():
+            await engine.dispose()
+        self.engines.clear()
+        self.replica_names.clear()
+        self._replayed.clear()
+        self.session_factory = None
+        self.read_session_factory = None
+
+    async def _replica_has_replayed(self, name: str, required: int) -> bool:
+        if self._replayed[name] >= required:
+            return True
+        try:
+            async with self.engines[name].connect() as conn:
+                lsn = (await conn.execute(text("SELECT pg_last_wal_replay_lsn()::text"))).scalar_one()
+        except (OSError, exc.DBAPIError) as error:
+            logger.warning("Replica %s unavailable for a consistent read: %s", name, error)
+            return False
+        # NULL WHEN THE SERVER IS NOT A STANDBY
+        if lsn is not None:
+            self._replayed[name] = max(self._replayed[name], parse_lsn(lsn))
+        return self._replayed[name] >= required
+
+    async def for_read(self, token: Optional[str] = None) -> str:
+        """
+        Name of the engine to serve a read: the next replica in rotation that has replayed past `token`
+        (any replica when there is no token), or the primary when none has.
+        """
+        if not self.replica_names:
+            return "primary"
+        if token is None:
+            return next(self._next_replica)
+        required = parse_lsn(token)
+        for _ in range(len(self.replica_names)):
+            name = next(self._next_replica)
+            if await self._replica_has_replayed(name, required):
+                return name
+        return "primary"
+
+    @property
+    def primary(self) -> AsyncEngine:
+        if "primary" not in self.engines:
+            raise RuntimeError("Database engines are not started; call engines.start() first")
+        return self.engines["primary"]
+
+    def pool_status(self) -> dict:
+        """Live pool numbers and settings per engine, for tuning."""
+        status = {}
+        for name, engine in self.engines.items():
+            pool = engine.sync_engine.pool
+            status[name] = {
+                "pool_size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": self.settings.DB_MAX_OVERFLOW,
+                "timeout": self.settings.DB_POOL_TIMEOUT,
+                "recycle": self.settings.DB_POOL_RECYCLE,
+                "pre_ping_idle_seconds": self.settings.DB_PRE_PING_IDLE_SECONDS,
+            }
+        return status
+
+
+engines = EngineRegistry()
 
-# Create a session factory
-AsyncSessionLocal = sessionmaker(
-    bind=engine,
-    class_=AsyncSession,
-    expire_on_commit=False
-)
 
 # Dependency to get a database session
 async def get_db() -> AsyncGenerator[AsyncSession, None]:
-    async with AsyncSessionLocal() as session:
-        yield session
\ No newline at end of file
+    async with engines.session_factory() as session:
+        yield session
+
+
+# Dependency to get a session for read-only routes: a replica when one is caught up with the client's token
+async def get_read_db(request: Request) -> AsyncGenerator[AsyncSession, None]:
+    name = await engines.for_read(request.headers.get(TOKEN_HEADER))
+    if engines.replica_names:
+        note_engine(name)
+    async with engines.read_session_factory(bind=engines.engines[name]) as session:
+        yield session
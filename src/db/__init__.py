@@ -1,3 +1,3 @@
-from .main import get_db
+from src.database import get_db
 
 __all__ = [get_db]
\ No newline at end of file
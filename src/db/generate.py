@@ -0,0 +1,241 @@
+# SYNTHETIC, PRODUCTION-SHAPED DATA AT SCALE, BULK-LOADED WITH COPY.
+# To run use >> python -m src.db.seed --generate --registrations 10000000 (see src/db/seed.py for all options)
+#
+# EVERYTHING, INCLUDING THE UUIDS, COMES FROM ONE random.Random(seed), SO THE SAME OPTIONS ALWAYS PRODUCE THE
+# SAME DATABASE. EVENT POPULARITY FOLLOWS A ZIPF DISTRIBUTION: THE EVENT OF POPULARITY RANK r GETS A SHARE OF
+# REGISTRATIONS PROPORTIONAL TO 1 / r ** zipf, SO A FEW HOT EVENTS FILL UP AND GROW WAITLISTS WHILE THE LONG TAIL
+# STAYS NEARLY EMPTY. SEATS ARE ASSIGNED IN LOAD ORDER: ONCE AN EVENT IS FULL, FURTHER REGISTRATIONS ARE WAITLISTED.
+# REGISTRATION created_at STRICTLY INCREASES IN LOAD ORDER TOO, AND WAITLIST QUEUE NUMBERS ARE HANDED OUT IN
+# LOAD ORDER, SO EVERY QUEUE IS ALSO IN FIFO (created_at, id) ORDER.
+import random
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from typing import Iterator, List
+
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.schema import CreateIndex
+
+from src.models import Attendee, Registration
+
+CATEGORY_COLUMNS = ["id", "name", "description", "created_at", "updated_at"]
+EVENT_COLUMNS = [
+    "id", "title", "description", "start_date", "end_date", "location", "max_capacity", "seats_taken",
+    "is_active", "category_id", "created_at", "updated_at",
+]
+ATTENDEE_COLUMNS = ["id", "first_name", "last_name", "email", "phone", "created_at", "updated_at"]
+REGISTRATION_COLUMNS = [
+    "id", "event_id", "attendee_id", "status", "registration_date", "created_at", "updated_at", "waitlist_seq",
+]
+
+_TOPICS = ["AI", "Python", "Data", "Cloud", "Security", "Jazz", "Rock", "Design", "Startup", "Film", "Food", "Health"]
+_FORMATS = ["Summit", "Conference", "Meetup", "Workshop", "Festival", "Expo", "Hackathon", "Night"]
+_CITIES = ["Lagos", "Nairobi", "London", "Berlin", "Chicago", "San Francisco", "Toronto", "Singapore", "Sydney"]
+_FIRST_NAMES = ["Ada", "Amina", "Chen", "David", "Fatima", "Grace", "Ivan", "John", "Kofi", "Lena", "Maria", "Noah"]
+_LAST_NAMES = ["Adeyemi", "Brown", "Garcia", "Kim", "Mensah", "Müller", "Nguyen", "Okafor", "Smith", "Wang"]
+_CAPACITIES = [None, 50, 100, 250, 500, 1000, 5000]
+
+
+@dataclass
+class GeneratorOptions:
+    categories: int = 20
+    events: int = 10_000
+    attendees: int = 1_000_000
+    registrations: int = 10_000_000
+    # ZIPF EXPONENT FOR EVENT POPULARITY; 0 IS UNIFORM, ~1 IS TYPICAL "HOT ITEMS" SKEW
+    zipf: float = 1.1
+    seed: int = 42
+    # SHARE OF REGISTRATIONS THAT WERE CANCELLED (THEY HOLD NO SEAT)
+    cancelled_rate: float = 0.05
+    batch_size: int = 50_000
+
+    def __post_init__(self):
+        # REJECT IMPOSSIBLE OPTIONS BEFORE ANY TABLE IS TOUCHED
+        for name in ("categories", "events", "attendees", "registrations"):
+            if getattr(self, name) < 0:
+                raise ValueError(f"{name} must not be negative")
+        if self.events and not self.categories:
+            raise ValueError("events need at least one category")
+        if self.registrations and not (self.events and self.attendees):
+            raise ValueError("registrations need at least one event and one attendee")
+        if self.registrations > self.attendees * self.events:
+            raise ValueError("more registrations than (attendee, event) pairs")
+        if not 0 <= self.cancelled_rate <= 1:
+            raise ValueError("cancelled_rate must be between 0 and 1")
+        if self.batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+
+
+class _Generator:
+    def __init__(self, options: GeneratorOptions):
+        self.options = options
+        self.rng = random.Random(options.seed)
+        self.now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+    def new_id(self) -> uuid.UUID:
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def past(self, days: int) -> datetime:
+        return self.now - timedelta(seconds=self.rng.randrange(days * 86400))
+
+    def categories(self) -> List[tuple]:
+        rows = []
+        for i in range(self.options.categories):
+            created = self.past(3 * 365)
+            topic = _TOPICS[i % len(_TOPICS)]
+            rows.append((self.new_id(), f"{topic} {i + 1}", f"{topic} events", created, created))
+        return rows
+
+    def events(self, category_ids: List[uuid.UUID]) -> List[tuple]:
+        rng, rows = self.rng, []
+        for i in range(self.options.events):
+            topic, kind, city = rng.choice(_TOPICS), rng.choice(_FORMATS), rng.choice(_CITIES)
+            start = self.now + timedelta(days=rng.randrange(-180, 365), hours=rng.randrange(8, 20))
+            created = start - timedelta(days=rng.randrange(30, 365))
+            rows.append((
+                self.new_id(), f"{topic} {kind} {city} {i + 1}", f"A {kind.lower()} about {topic} in {city}",
+                start, start + timedelta(hours=rng.choice([3, 8, 24, 72])), city, rng.choice(_CAPACITIES), 0,
+                rng.random() > 0.05, rng.choice(category_ids), created, created,
+            ))
+        return rows
+
+    def attendees(self) -> Iterator[tuple]:
+        rng = self.rng
+        for i in range(self.options.attendees):
+            first, last = rng.choice(_FIRST_NAMES), rng.choice(_LAST_NAMES)
+            created = self.past(2 * 365)
+            yield (
+                self.new_id(), first, last, f"{first.lower()}.{last.lower()}.{i}@example.com",
+                f"+1 {rng.randrange(200, 999)} {rng.randrange(1_000_000, 9_999_999)}", created, created,
+            )
+
+    def registrations(
+        self, events: List[tuple], attendee_ids: List[uuid.UUID], taken: List[int], queued: List[int]
+    ) -> Iterator[tuple]:
+        rng, options = self.rng, self.options
+        count = len(events)
+        # RANK -> EVENT INDEX IS A RANDOM PERMUTATION, SO HOT EVENTS ARE SPREAD OVER CATEGORIES AND DATES
+        by_rank = list(range(count))
+        rng.shuffle(by_rank)
+        cum_weights = list(accumulate(1 / (rank ** options.zipf) for rank in range(1, count + 1)))
+        capacities = [row[6] for row in events]
+        # REGISTRATIONS SPREAD OVER THE LAST 180 DAYS: ROW k FALLS IN THE k-TH SLOT OF step MICROSECONDS, AT A
+        # RANDOM POINT INSIDE IT, SO TIMESTAMPS ARE DISTINCT AND IN LOAD ORDER
+        first = self.now - timedelta(days=180)
+        step = max(1, 180 * 86400 * 10 ** 6 // max(1, options.registrations))
+        loaded = 0
+
+        per_attendee, extra = divmod(options.registrations, len(attendee_ids))
+        for index, attendee_id in enumerate(attendee_ids):
+            wanted = min(per_attendee + (index < extra), count)
+            chosen = set()
+            # DRAW FROM THE SKEWED DISTRIBUTION; AN ATTENDEE REGISTERS FOR AN EVENT AT MOST ONCE. IF REPEATED
+            # DRAWS KEEP HITTING EVENTS ALREADY CHOSEN, TOP UP UNIFORMLY FROM THE REST.
+            for _ in range(10):
+                if len(chosen) == wanted:
+                    break
+                draws = rng.choices(range(count), cum_weights=cum_weights, k=wanted - len(chosen))
+                chosen.update(by_rank[rank] for rank in draws)
+            if len(chosen) < wanted:
+                rest = [event_index for event_index in range(count) if event_index not in chosen]
+                chosen.update(rng.sample(rest, wanted - len(chosen)))
+            for event_index in chosen:
+                capacity = capacities[event_index]
+                if rng.random() < options.cancelled_rate:
+                    status = "cancelled"
+                elif capacity is None or taken[event_index] < capacity:
+                    status = "confirmed" if rng.random() < 0.3 else "registered"
+                    taken[event_index] += 1
+                else:
+                    status = "waitlisted"
+                seq = None
+                if status == "waitlisted":
+                    queued[event_index] += 1
+                    seq = queued[event_index]
+                created = first + timedelta(microseconds=loaded * step + rng.randrange(step))
+                loaded += 1
+                yield (self.new_id(), events[event_index][0], attendee_id, status, created, created, created, seq)
+
+
+def _batches(rows: Iterator[tuple], size: int) -> Iterator[List[tuple]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def generate(engine: AsyncEngine, options: GeneratorOptions) -> dict:
+    """
+    Replace the contents of the four tables with generated data, in one transaction. Secondary indexes
+    on attendees and registrations are dropped for the load and rebuilt after it.
+    """
+    generator = _Generator(options)
+    started = time.perf_counter()
+
+    def progress(message: str) -> None:
+        print(f"[{time.perf_counter() - started:7.1f}s] {message}")
+
+    # SECONDARY INDEXES ARE CHEAPER TO BUILD ONCE OVER THE LOADED TABLE THAN TO MAINTAIN ROW BY ROW
+    rebuilt = [index for table in (Attendee.__table__, Registration.__table__) for index in table.indexes]
+
+    async with engine.connect() as conn:
+        driver = (await conn.get_raw_connection()).driver_connection
+        async with driver.transaction():
+            await driver.execute("SET LOCAL synchronous_commit = off")
+            await driver.execute("SET LOCAL maintenance_work_mem = '512MB'")
+            await driver.execute("TRUNCATE registrations, events, attendees, categories CASCADE")
+            for index in rebuilt:
+                await driver.execute(f'DROP INDEX IF EXISTS "{index.name}"')
+
+            categories = generator.categories()
+            await driver.copy_records_to_table("categories", records=categories, columns=CATEGORY_COLUMNS)
+            events = generator.events([row[0] for row in categories])
+            await driver.copy_records_to_table("events", records=events, columns=EVENT_COLUMNS)
+            progress(f"{len(categories)} categories, {len(events)} events")
+
+            attendee_ids = []
+            for batch in _batches(generator.attendees(), options.batch_size):
+                await driver.copy_records_to_table("attendees", records=batch, columns=ATTENDEE_COLUMNS)
+                attendee_ids.extend(row[0] for row in batch)
+            progress(f"{len(attendee_ids)} attendees")
+
+            taken, queued = [0] * len(events), [0] * len(events)
+            loaded = 0
+            for batch in _batches(generator.registrations(events, attendee_ids, taken, queued), options.batch_size):
+                await driver.copy_records_to_table("registrations", records=batch, columns=REGISTRATION_COLUMNS)
+                loaded += len(batch)
+                if loaded % (options.batch_size * 20) == 0:
+                    progress(f"{loaded} registrations")
+            progress(f"{loaded} registrations")
+
+            # SEAT AND WAITLIST COUNTERS IN ONE SET-BASED UPDATE
+            await driver.execute(
+                "CREATE TEMP TABLE generated_seats (id uuid, seats integer, tail bigint) ON COMMIT DROP"
+            )
+            await driver.copy_records_to_table("generated_seats", records=[
+                (row[0], seats, tail) for row, seats, tail in zip(events, taken, queued) if seats or tail
+            ])
+            await driver.execute(
+                "UPDATE events SET seats_taken = s.seats, waitlist_tail = s.tail FROM generated_seats s "
+                "WHERE events.id = s.id"
+            )
+
+            for index in rebuilt:
+                await driver.execute(str(CreateIndex(index).compile(dialect=engine.dialect)))
+            progress(f"rebuilt {len(rebuilt)} indexes")
+
+        await driver.execute("ANALYZE categories, events, attendees, registrations")
+    progress("done")
+    return {
+        "categories": len(categories),
+        "events": len(events),
+        "attendees": len(attendee_ids),
+        "registrations": loaded,
+        "seconds": round(time.perf_counter() - started, 1),
+    }
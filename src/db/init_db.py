@@ -1,17 +1,21 @@
 # This file is used to create all tables in the database.
 # To run this file use >> python -m src.db.init_db
 from src.db.base import Base
-from src.database import engine
+from src.database import engines
 import asyncio
 from sqlalchemy import text
 async def init_db():
-    async with engine.begin() as conn:
+    engines.start()
+    async with engines.primary.begin() as conn:
         await conn.execute(text("DROP TABLE IF EXISTS registrations CASCADE"))
         await conn.execute(text("DROP TABLE IF EXISTS events CASCADE"))
         await conn.execute(text("DROP TABLE IF EXISTS attendees CASCADE"))
         await conn.execute(text("DROP TABLE IF EXISTS categories CASCADE"))
+        # REQUIRED BY THE gin_trgm_ops INDEXES ON ATTENDEES
+        await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
         await conn.run_sync(Base.metadata.create_all)
     
+    await engines.dispose()
     print("Database tables recreated!")
 
 if __name__ == "__main__":
@@ -1,12 +1,18 @@
 #To run seed.py file use :  python -m src.db.seed
-from src.db.main import AsyncSessionLocal
+# For production-sized synthetic data use :  python -m src.db.seed --generate [--registrations 10000000 ...]
+from src.database import engines
 from src.models import Category, Event, Attendee, Registration, RegistrationStatus 
 from datetime import datetime, timezone
+import argparse
 import asyncio
+from dataclasses import fields
 from sqlalchemy import text
+from src.db.generate import GeneratorOptions, generate
+from src.services.registrations import recount_seats
 
 async def seed_database():
-    async with AsyncSessionLocal() as db:
+    engines.start()
+    async with engines.session_factory() as db:
         try:
             # CLEAR EXISTING DATA IN CORRECT ORDER
             await db.execute(text("DELETE FROM registrations"))
@@ -79,12 +85,41 @@ async def seed_database():
             db.add_all([registration1, registration2])
             await db.commit()
 
+            # REGISTRATIONS ADDED THROUGH THE ORM BYPASS SEAT BOOKKEEPING
+            await recount_seats(db)
+            await db.commit()
+
             print("...Database seeded successfully!")
 
         except Exception as e:
             await db.rollback()
             print("... Error seeding database:", e)
             raise
+        finally:
+            await engines.dispose()
+
+
+async def generate_database(options: GeneratorOptions):
+    engines.start()
+    try:
+        counts = await generate(engines.primary, options)
+        print("...Database generated:", counts)
+    finally:
+        await engines.dispose()
 
 if __name__ == "__main__":
-    asyncio.run(seed_database())
\ No newline at end of file
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--generate", action="store_true", help="Replace all data with generated data loaded through COPY")
+    # ONE FLAG PER GeneratorOptions FIELD (--events, --zipf, --seed ...), DEFAULTING TO ITS DEFAULT
+    for option in fields(GeneratorOptions):
+        parser.add_argument(f"--{option.name.replace('_', '-')}", type=type(option.default), default=option.default)
+    args = parser.parse_args()
+
+    if args.generate:
+        try:
+            options = GeneratorOptions(**{option.name: getattr(args, option.name) for option in fields(GeneratorOptions)})
+        except ValueError as exc:
+            parser.error(str(exc))
+        asyncio.run(generate_database(options))
+    else:
+        asyncio.run(seed_database())
\ No newline at end of file
@@ -0,0 +1,68 @@
+from functools import lru_cache
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi import HTTPException, Query, status
+from pydantic import ConfigDict, create_model
+from sqlalchemy.orm import load_only
+from sqlalchemy.orm.attributes import QueryableAttribute
+from sqlalchemy.orm.properties import ColumnProperty
+
+# SPARSE FIELDSETS: ?fields=id,title,start_date ON THE GET ROUTES. THE NAMES ARE CHECKED AGAINST THE ROUTE'S RESPONSE
+# SCHEMA, ONLY THEIR COLUMNS ARE SELECTED (src.records.select_for ON THE CORE PATH, load_only() ON THE ORM ROUTES),
+# RELATIONSHIPS THAT WERE NOT ASKED FOR ARE NOT QUERIED AT ALL, AND THE BODY IS SERIALIZED WITH partial(), A COPY
+# OF THE SCHEMA WITH JUST THOSE FIELDS.
+FieldSet = Optional[Tuple[str, ...]]
+
+# ?fields= IS CLIENT INPUT, SO EVERY CACHE KEYED ON A FIELDSET (partial() HERE, src.records.record_type,
+# src.serialization.adapter) IS BOUNDED: A CLIENT CYCLING THROUGH COMBINATIONS COSTS RECOMPILES, NOT MEMORY.
+FIELDSET_CACHE_SIZE = 256
+
+
+def sparse_fields(schema: Any) -> Callable[..., FieldSet]:
+    """Dependency parsing `?fields=` into a tuple of `schema` field names in schema order, or None for all fields."""
+    known = list(schema.model_fields)
+
+    def dependency(
+        fields: Optional[str] = Query(None, description=f"Comma-separated fields to return, of: {', '.join(known)}"),
+    ) -> FieldSet:
+        if fields is None:
+            return None
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = sorted(requested.difference(known))
+        if not requested or unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown) or '(none given)'}; expected some of: {', '.join(known)}",
+            )
+        return tuple(name for name in known if name in requested)
+
+    return dependency
+
+
+@lru_cache(maxsize=FIELDSET_CACHE_SIZE)
+def partial(schema: Any, fields: FieldSet) -> Any:
+    """`schema` narrowed to `fields` (the schema itself when fields is None)."""
+    if fields is None:
+        return schema
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{name: (schema.model_fields[name].annotation, schema.model_fields[name]) for name in fields},
+    )
+
+
+def wants(fields: FieldSet, *names: str) -> bool:
+    """Whether any of `names` is part of the response; everything is when no fieldset was given."""
+    return fields is None or any(name in fields for name in names)
+
+
+def load_columns(model: Any, fields: FieldSet):
+    """load_only() option for the requested column attributes of `model`, or None to load them all."""
+    if fields is None:
+        return None
+    columns = [
+        attribute for attribute in (getattr(model, name, None) for name in fields)
+        if isinstance(attribute, QueryableAttribute) and isinstance(attribute.property, ColumnProperty)
+    ]
+    # THE PRIMARY KEY IS ALWAYS LOADED; load_only() NEEDS AT LEAST ONE ATTRIBUTE
+    return load_only(*(columns or [model.id]))
@@ -0,0 +1,160 @@
+import logging
+import random
+import time
+import uuid
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+from src import slow_queries
+from src.config import Config
+from src.metrics import observe_pool_wait
+
+# PER-REQUEST SQL INSTRUMENTATION. THE MIDDLEWARE PUTS A RequestStats IN A CONTEXT VARIABLE; SQLALCHEMY EVENT
+# LISTENERS AND THE POOL ADD TO IT. SQLALCHEMY'S ASYNC LAYER RUNS DRIVER CALLS IN A GREENLET THAT SHARES THE
+# REQUEST TASK'S CONTEXT, SO THE LISTENERS SEE THE SAME OBJECT.
+logger = logging.getLogger(__name__)
+sql_logger = logging.getLogger("src.sql")
+# POOL CLASSES LOG CHECKOUT/DISPOSE CHATTER UNDER THEIR MODULE NAME; QUIET IT THE WAY SQLALCHEMY QUIETS ITS OWN
+logging.getLogger(f"{__name__}.InstrumentedAsyncQueuePool").setLevel(logging.WARNING)
+
+
+@dataclass
+class RequestStats:
+    started: float = field(default_factory=time.perf_counter)
+    queries: int = 0
+    db_time: float = 0.0
+    rows: int = 0
+    pool_wait: float = 0.0
+    request_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    scope: Optional[dict] = None
+
+    @property
+    def route(self) -> Optional[str]:
+        # THE ROUTER ADDS THE MATCHED ROUTE TO THE SHARED SCOPE DICT
+        return getattr((self.scope or {}).get("route"), "path", None)
+
+
+request_stats: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waited for a free connection."""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - started
+            observe_pool_wait(self, waited)
+            stats = request_stats.get()
+            if stats is not None:
+                stats.pool_wait += waited
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    # SAMPLED SQL LOG; PARAMETERS ARE LEFT OUT SO NO PERSONAL DATA REACHES THE LOGS
+    if Config.SQL_LOG_SAMPLE_RATE > 0 and random.random() < Config.SQL_LOG_SAMPLE_RATE:
+        sql_logger.info(
+            "%s", statement,
+            extra={"duration_ms": round(elapsed * 1000, 2), "rowcount": cursor.rowcount, "executemany": executemany},
+        )
+    stats = request_stats.get()
+    if Config.SLOW_QUERY_MS > 0 and elapsed * 1000 >= Config.SLOW_QUERY_MS:
+        engine_name = getattr(conn.engine.pool, "metrics_name", None)
+        slow_queries.capture(engine_name, statement, parameters, executemany, elapsed, stats)
+    if stats is None:
+        return
+    stats.queries += 1
+    stats.db_time += elapsed
+    # THE ASYNCPG ADAPTER FETCHES RESULT ROWS DURING EXECUTE AND SETS rowcount FROM THE COMMAND TAG
+    if cursor.description is not None and cursor.rowcount > 0:
+        stats.rows += cursor.rowcount
+
+
+def _handle_error(exception_context):
+    # A FAILED STATEMENT NEVER REACHES after_cursor_execute; DROP ITS START TIME
+    started = exception_context.connection.info.get("query_started") if exception_context.connection else None
+    if started:
+        started.pop()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Attach the per-request query listeners to an async engine."""
+    event.listen(engine.sync_engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine.sync_engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine.sync_engine, "handle_error", _handle_error)
+
+
+def server_timing(stats: RequestStats, total: float) -> str:
+    return ", ".join([
+        f'db;dur={stats.db_time * 1000:.1f};desc="{stats.queries} queries, {stats.rows} rows"',
+        f"db-pool;dur={stats.pool_wait * 1000:.1f}",
+        f"total;dur={total * 1000:.1f}",
+    ])
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware adding Server-Timing, X-Query-Count and X-Request-ID headers, and logging a warning when a route
+    exceeds Settings.QUERY_BUDGET queries or Settings.LATENCY_BUDGET_MS milliseconds.
+    Streaming responses only report the queries made before their first byte.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(scope=scope)
+        # KEEP A REQUEST ID SET BY A PROXY IN FRONT OF US
+        for name, value in scope.get("headers", []):
+            if name == b"x-request-id" and value:
+                stats.request_id = value.decode("latin-1")[:128]
+        token = request_stats.set(stats)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                total = time.perf_counter() - stats.started
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", server_timing(stats, total).encode()))
+                headers.append((b"x-query-count", str(stats.queries).encode()))
+                headers.append((b"x-request-id", stats.request_id.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_headers)
+        finally:
+            request_stats.reset(token)
+            self._check_budget(scope, stats)
+
+    @staticmethod
+    def _check_budget(scope, stats: RequestStats) -> None:
+        elapsed_ms = (time.perf_counter() - stats.started) * 1000
+        if stats.queries <= Config.QUERY_BUDGET and elapsed_ms <= Config.LATENCY_BUDGET_MS:
+            return
+        route = scope.get("route")
+        logger.warning(
+            "Request budget exceeded: %s %s took %.1f ms with %d queries (%.1f ms in DB, %d rows, %.1f ms pool wait)",
+            scope.get("method"),
+            getattr(route, "path", scope.get("path")),
+            elapsed_ms,
+            stats.queries,
+            stats.db_time * 1000,
+            stats.rows,
+            stats.pool_wait * 1000,
+        )
@@ -0,0 +1,139 @@
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Optional
+
+from src.config import Settings
+from src.instrumentation import request_stats
+
+# NON-BLOCKING LOGGING. EVERY LOGGER HANDS ITS RECORDS TO A QueueHandler, WHICH ONLY PUTS THEM ON AN IN-MEMORY
+# QUEUE; A QueueListener THREAD FORMATS THEM AS ONE JSON OBJECT PER LINE AND WRITES THEM TO STDOUT, SO THE
+# EVENT LOOP NEVER WAITS ON THE TERMINAL OR A LOG COLLECTOR.
+access_logger = logging.getLogger("src.access")
+
+# ATTRIBUTES EVERY LogRecord HAS; ANYTHING ELSE CAME FROM extra= AND IS EMITTED AS A JSON FIELD
+_RECORD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, any extra= fields and the traceback."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    # THE STOCK prepare() FOLDS THE TRACEBACK INTO THE MESSAGE; KEEP IT SEPARATE FOR THE exc_info FIELD
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = logging.makeLogRecord(vars(record))
+        record.msg, record.args = record.getMessage(), None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _parse_levels(levels: str) -> dict:
+    # "sqlalchemy.engine=INFO,src.sql=DEBUG" -> {"sqlalchemy.engine": "INFO", "src.sql": "DEBUG"}
+    parsed = {}
+    for item in levels.split(","):
+        if "=" in item:
+            name, level = item.split("=", 1)
+            parsed[name.strip()] = level.strip().upper()
+    return parsed
+
+
+def configure_logging(settings: Settings) -> None:
+    """Route all logging through one queue and a listener thread, with levels from `settings`."""
+    global _listener
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_QueueHandler(log_queue))
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    # UVICORN'S OWN HANDLERS WOULD WRITE SYNCHRONOUSLY; LET ITS RECORDS PROPAGATE TO THE QUEUE INSTEAD
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers.clear()
+        logging.getLogger(name).propagate = True
+    for name, level in _parse_levels(settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    # FLUSHES WHATEVER IS STILL QUEUED
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+class AccessLogMiddleware:
+    """ASGI middleware writing one structured access log record per HTTP request."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not access_logger.isEnabledFor(logging.INFO):
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        size = 0
+
+        async def send_and_measure(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_and_measure)
+        finally:
+            client = scope.get("client")
+            stats = request_stats.get()
+            access_logger.info(
+                "%s %s %d", scope["method"], scope["path"], status_code,
+                extra={
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": getattr(scope.get("route"), "path", None),
+                    "status": status_code,
+                    "duration_ms": round((time.perf_counter() - started) * 1000, 2),
+                    "bytes": size,
+                    "queries": stats.queries if stats is not None else None,
+                    "request_id": stats.request_id if stats is not None else None,
+                    "client": client[0] if client else None,
+                },
+            )
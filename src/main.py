@@ -1,14 +1,24 @@
 
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 from pydantic import BaseModel
 from typing import List
-from src.routers import attendees, categories, events, registrations
+from src.routers import attendees, categories, debug, events, registrations
+from src.services import attendee_import
+from src.database import engines
+from src.instrumentation import QueryStatsMiddleware
+from src.consistency import ConsistencyMiddleware
+from src import metrics, slow_queries
+from src.config import Config
+from src.logging_config import AccessLogMiddleware, configure_logging, shutdown_logging
+import logging
+
+logger = logging.getLogger(__name__)
 
 # DEFINE PYDANTIC MODELS FOR STRUCTURED RESPONSES
 class EndpointInfo(BaseModel):
@@ -25,10 +35,18 @@ class RootResponse(BaseModel):
 # LIFECYCLE EVENT HANDLER
 @asynccontextmanager
 async def life_span(app: FastAPI):
-  
-    print(f"Starting the server ...")
+    configure_logging(Config)
+    logger.info("Starting the server ...")
+    engines.start()
+    slow_queries.start(engines)
+    attendee_import.sweep_error_reports(Config.IMPORT_REPORT_TTL_SECONDS)
     yield
-    print(f"Stopping the server ...")
+    await slow_queries.stop()
+    await engines.dispose()
+    attendee_import.shutdown_pool()
+    metrics.mark_process_dead()
+    logger.info("Stopping the server ...")
+    shutdown_logging()
 
 
 version = "1.0.0"
@@ -37,7 +55,9 @@ app = FastAPI(
     title="EVENTITLY",
     description="API for Event Management",
     version=version,
-    lifespan=life_span
+    lifespan=life_span,
+    # orjson FOR EVERY RESPONSE THAT DOES NOT TAKE THE src/serialization.py FAST PATH
+    default_response_class=ORJSONResponse,
 )
 
 
@@ -73,11 +93,23 @@ async def health_check():
     """
     return {"status": "healthy"}
 
+# PROMETHEUS METRICS ENDPOINT (AGGREGATED ACROSS WORKERS WHEN PROMETHEUS_MULTIPROC_DIR IS SET)
+@app.get("/metrics", tags=["root"], include_in_schema=False)
+async def metrics_endpoint():
+    """
+    Prometheus scrape endpoint.
+    """
+    payload, content_type = metrics.render()
+    return Response(content=payload, media_type=content_type)
+
 # INCLUDE ROUTERS
 app.include_router(categories.router, prefix="/categories", tags=["categories"])
 app.include_router(events.router, prefix="/events", tags=["events"])
 app.include_router(attendees.router, prefix="/attendees", tags=["attendees"])
 app.include_router(registrations.router, prefix="/registrations", tags=["registrations"])
+# DIAGNOSTICS ONLY WHEN EXPLICITLY ENABLED (SEE Settings.DEBUG_ENDPOINTS_ENABLED)
+if Config.DEBUG_ENDPOINTS_ENABLED:
+    app.include_router(debug.router, prefix="/debug", tags=["debug"])
 
 # CORS MIDDLEWARE - ENABLES CROSS-ORIGIN REQUESTS FOR ALL ROUTES.
 app.add_middleware(
@@ -85,9 +117,22 @@ app.add_middleware(
     allow_origins=["*"],
     allow_credentials=True,
     allow_methods=["*"],
-    allow_headers=["*"]
+    allow_headers=["*"],
+    expose_headers=["Server-Timing", "X-Query-Count", "X-Request-ID", "Link", "X-Consistency-Token", "X-DB-Route"]
 )
 
+# STRUCTURED JSON ACCESS LOG (INSIDE QueryStatsMiddleware SO IT CAN REPORT THE QUERY COUNT)
+app.add_middleware(AccessLogMiddleware)
+
+# PER-REQUEST SQL STATS: Server-Timing AND X-Query-Count HEADERS, BUDGET WARNINGS IN THE LOG
+app.add_middleware(QueryStatsMiddleware)
+
+# READ-YOUR-WRITES: X-Consistency-Token AFTER COMMITS, READS ROUTED TO A REPLICA THAT HAS CAUGHT UP WITH IT
+app.add_middleware(ConsistencyMiddleware)
+
+# PROMETHEUS REQUEST METRICS: LATENCY, IN-FLIGHT, STATUS CODES AND RESPONSE SIZES PER ROUTE
+app.add_middleware(metrics.MetricsMiddleware)
+
 # ADD ERROR HANDLING FOR VALIDATION ERRORS
 @app.exception_handler(RequestValidationError)
 async def validation_exception_handler(request: Request, exc: RequestValidationError):
@@ -110,6 +155,7 @@ async def global_exception_handler(request: Request, exc: Exception):
     Handle any unhandled exceptions and return a formatted response.
     """
     # LOG ERROR IN PRODUCTION (WHY: FOR POST-MORTEM ANALYSIS)
+    logger.error("Unhandled error on %s %s", request.method, request.url.path, exc_info=exc)
     return JSONResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
@@ -121,4 +167,5 @@ if __name__ == "__main__":
     import uvicorn
     import os
     port = int(os.getenv("PORT", 10000))
-    uvicorn.run("src.main:app", host="0.0.0.0", port=port)
\ No newline at end of file
+    # UVICORN'S ACCESS LOG IS REPLACED BY AccessLogMiddleware; ITS OTHER RECORDS GO THROUGH OUR QUEUE
+    uvicorn.run("src.main:app", host="0.0.0.0", port=port, access_log=False, log_config=None)
\ No newline at end of file
@@ -0,0 +1,122 @@
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client import multiprocess
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+# PROMETHEUS METRICS. WITH SEVERAL UVICORN WORKERS, SET THE PROMETHEUS_MULTIPROC_DIR ENVIRONMENT VARIABLE TO AN
+# EMPTY, WRITABLE DIRECTORY BEFORE STARTING: EVERY WORKER THEN WRITES ITS SAMPLES THERE AND /metrics, SERVED BY
+# WHICHEVER WORKER, AGGREGATES ALL OF THEM. WITHOUT IT, EACH PROCESS ONLY REPORTS ITS OWN SAMPLES.
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency", ["method", "route"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served", ["method"],
+    multiprocess_mode="livesum",
+)
+RESPONSES = Counter(
+    "http_responses_total", "HTTP responses by status code", ["method", "route", "status"],
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes", "HTTP response body size", ["method", "route"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+)
+
+POOL_SIZE = Gauge("db_pool_size", "Configured pool_size", ["engine"], multiprocess_mode="livesum")
+POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Connections currently checked out", ["engine"], multiprocess_mode="livesum",
+)
+POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Connections open beyond pool_size", ["engine"], multiprocess_mode="livesum",
+)
+POOL_WAIT = Histogram(
+    "db_pool_wait_seconds", "Time spent waiting for a pool checkout", ["engine"],
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+
+
+def _update_pool_gauges(pool) -> None:
+    name = pool.metrics_name
+    POOL_SIZE.labels(name).set(pool.size())
+    POOL_CHECKED_OUT.labels(name).set(pool.checkedout())
+    POOL_OVERFLOW.labels(name).set(max(pool.overflow(), 0))
+
+
+def instrument_pool(engine: AsyncEngine, name: str) -> None:
+    """Report an engine's pool gauges under engine=<name>, refreshed on every checkout and checkin."""
+    pool = engine.sync_engine.pool
+    pool.metrics_name = name
+    event.listen(pool, "checkout", lambda dbapi_conn, record, proxy: _update_pool_gauges(pool))
+    event.listen(pool, "checkin", lambda dbapi_conn, record: _update_pool_gauges(pool))
+    _update_pool_gauges(pool)
+
+
+def observe_pool_wait(pool, seconds: float) -> None:
+    name = getattr(pool, "metrics_name", None)
+    if name is not None:
+        POOL_WAIT.labels(name).observe(seconds)
+
+
+def render() -> tuple:
+    """The exposition payload and its content type, aggregated across workers in multiprocess mode."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    # DROPS THIS WORKER'S livesum GAUGES FROM THE AGGREGATE WHEN IT SHUTS DOWN
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency, in-flight requests, status codes and response sizes per route."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        started = time.perf_counter()
+        status_code = 500
+        size = 0
+
+        async def send_and_measure(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        try:
+            await self.app(scope, receive, send_and_measure)
+        finally:
+            in_flight.dec()
+            # ROUTE TEMPLATES, NOT RAW PATHS, KEEP LABEL CARDINALITY BOUNDED
+            route = getattr(scope.get("route"), "path", "unmatched")
+            REQUEST_LATENCY.labels(method, route).observe(time.perf_counter() - started)
+            RESPONSES.labels(method, route, str(status_code)).inc()
+            RESPONSE_SIZE.labels(method, route).observe(size)
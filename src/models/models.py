@@ -1,10 +1,10 @@
-from sqlalchemy import (Column,String,Text,DateTime,ForeignKey,Boolean,Integer,String, Text, Boolean)
+from sqlalchemy import (Column,String,Text,DateTime,ForeignKey,Boolean,Integer,String, Text, Boolean, Index, Computed, UniqueConstraint, BigInteger, CheckConstraint)
 from datetime import datetime, timezone
 from src.db.base import Base
 from enum import Enum  
-from sqlalchemy.sql import func
-from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func, text
+from sqlalchemy.dialects.postgresql import UUID, TSVECTOR, TSTZRANGE
+from sqlalchemy.orm import relationship, deferred
 import uuid
 # CATEGORY TABLE (MATCHES ERD CORRECTLY)
 class Category(Base):
@@ -31,6 +31,10 @@ class Event(Base):
     end_date = Column(DateTime(timezone=True), nullable=False)
     location = Column(String(255), nullable=True)
     max_capacity = Column(Integer, nullable=True)
+    # SEATS HELD BY REGISTERED/CONFIRMED REGISTRATIONS, MAINTAINED BY src.services.registrations
+    seats_taken = Column(Integer, nullable=False, default=0, server_default="0")
+    # LAST WAITLIST QUEUE NUMBER HANDED OUT FOR THE EVENT (SEE Registration.waitlist_seq)
+    waitlist_tail = Column(BigInteger, nullable=False, default=0, server_default="0")
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
@@ -39,9 +43,40 @@ class Event(Base):
     category_id = Column(UUID(as_uuid=True), ForeignKey("categories.id"), nullable=False)
     category = relationship("Category", back_populates="events")
 
+    # FULL-TEXT SEARCH DOCUMENT (GENERATED BY POSTGRES): TITLE WEIGHTED ABOVE DESCRIPTION.
+    # DEFERRED SO ORDINARY EVENT QUERIES NEVER FETCH IT.
+    search_vector = deferred(Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+    ))
+
+    # THE EVENT'S SPAN AS ONE RANGE (GENERATED BY POSTGRES), FOR OVERLAP/CONTAINMENT QUERIES ON THE GiST INDEX.
+    # least/greatest KEEP A MIS-ORDERED start/end PAIR FROM FAILING THE INSERT. DEFERRED LIKE search_vector.
+    during = deferred(Column(
+        TSTZRANGE,
+        Computed("tstzrange(least(start_date, end_date), greatest(start_date, end_date), '[]')", persisted=True),
+    ))
+
     # ONE-TO-MANY WITH REGISTRATION
     event_attendees = relationship("Registration", back_populates="event", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index("ix_events_search_vector", "search_vector", postgresql_using="gin"),
+        # GET /events?start_date&end_date&mode=overlaps|within|contains
+        Index("ix_events_during", "during", postgresql_using="gist"),
+        # GET /events?category_id=...[&start_date&end_date], CATEGORY -> EVENTS LOADS AND CATEGORY DELETES (FK)
+        Index("ix_events_category_id_start_date", "category_id", "start_date"),
+        # GET /events PAGE ORDERS (sort=start_date|created_at|title), KEYSET (column, id) > (:column, :id);
+        # start_date ALSO SERVES mode=starts_within
+        Index("ix_events_start_date_id", "start_date", "id"),
+        Index("ix_events_created_at_id", "created_at", "id"),
+        Index("ix_events_title_id", "title", "id"),
+    )
+
 
 # ATTENDEE TABLE (MATCHES ERD)
 class Attendee(Base):
@@ -52,12 +87,22 @@ class Attendee(Base):
     last_name = Column(String(50), nullable=False)
     email = Column(String(100), unique=True, nullable=False)
     phone = Column(String(20), nullable=False)
+    # DIGITS-ONLY COPY OF PHONE (GENERATED BY POSTGRES) SO "+1 (234)" AND "1234" MATCH THE SAME ROWS
+    phone_digits = Column(String(20), Computed("regexp_replace(phone, '[^0-9]', '', 'g')", persisted=True))
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
 
     # ONE-TO-MANY RELATIONSHIP WITH REGISTRATION
     registrations = relationship("Registration", back_populates="attendee", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # KEYSET PAGINATION ORDER FOR GET /attendees: (created_at, id) > (:created_at, :id)
+        Index("ix_attendees_created_at_id", "created_at", "id"),
+        # PG_TRGM GIN INDEXES: SERVE SUBSTRING (LIKE '%x%') AND SIMILARITY SEARCH WITHOUT A SEQUENTIAL SCAN
+        Index("ix_attendees_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+        Index("ix_attendees_phone_digits_trgm", "phone_digits", postgresql_using="gin", postgresql_ops={"phone_digits": "gin_trgm_ops"}),
+    )
+
 
 # REGISTRATION TABLE (EVENT_ATTENDEE)
 class RegistrationStatus(str, Enum):
@@ -78,9 +123,38 @@ class Registration(Base):
     attendee_id = Column(UUID(as_uuid=True), ForeignKey("attendees.id"), nullable=False)
     status = Column(String(20), default=RegistrationStatus.REGISTERED.value, nullable=False)
     registration_date = Column(DateTime(timezone=True), default=datetime.now(timezone.utc))
+    # PLACE IN THE EVENT'S WAITLIST QUEUE, SET ONLY WHILE WAITLISTED. NUMBERS ARE HANDED OUT FROM
+    # Event.waitlist_tail AND KEPT DENSE BEHIND THE HEAD, SO POSITION = waitlist_seq - HEAD'S waitlist_seq + 1
+    waitlist_seq = Column(BigInteger, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     
     # RELATIONSHIPS WITH EVENT AND ATTENDEE
     event = relationship("Event", back_populates="event_attendees")
     attendee = relationship("Attendee", back_populates="registrations")
+
+    __table_args__ = (
+        UniqueConstraint("event_id", "attendee_id", name="uq_registrations_event_attendee"),
+        CheckConstraint("(status = 'waitlisted') = (waitlist_seq IS NOT NULL)", name="ck_registrations_waitlist_seq"),
+        # WAITLIST QUEUE ORDER PER EVENT: FIFO PROMOTION AND THE HEAD-OF-QUEUE PROBE FOR WAITLIST POSITIONS
+        Index(
+            "ix_registrations_waitlist_seq", "event_id", "waitlist_seq",
+            postgresql_where=text("status = 'waitlisted'"),
+        ),
+        # GET /events/{id}/attendees?status=..., EXPORT FILTERS AND SEAT RECOUNTS; attendee_id IS INCLUDED SO THE
+        # JOIN TO ATTENDEES NEEDS NO HEAP VISITS ON REGISTRATIONS
+        Index(
+            "ix_registrations_event_id_status", "event_id", "status",
+            postgresql_include=["attendee_id"],
+        ),
+        # GET /attendees/{id} REGISTRATION HISTORY, GET /registrations?attendee_id=... PAGES AND ATTENDEE DELETES (FK);
+        # THE UNIQUE CONSTRAINT LEADS WITH event_id
+        Index(
+            "ix_registrations_attendee_id_created_at_id", "attendee_id", "created_at", "id",
+            postgresql_include=["event_id", "status"],
+        ),
+        # GET /registrations PAGES, KEYSET (created_at, id), UNFILTERED OR FILTERED BY event_id OR status
+        Index("ix_registrations_created_at_id", "created_at", "id"),
+        Index("ix_registrations_event_id_created_at_id", "event_id", "created_at", "id"),
+        Index("ix_registrations_status_created_at_id", "status", "created_at", "id"),
+    )
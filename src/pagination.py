@@ -0,0 +1,72 @@
+import base64
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+from uuid import UUID
+
+from fastapi import HTTPException, Request, Response, status
+from sqlalchemy import tuple_
+
+from src.schemas.page import Page
+from src.serialization import json_response
+
+# OPAQUE KEYSET CURSORS: THE SORT KEY OF THE LAST ROW ON A PAGE, JSON-ENCODED AND BASE64-URL WRAPPED.
+# THE NEXT PAGE IS "ROWS WHOSE SORT KEY IS GREATER THAN THE CURSOR", WHICH AN INDEX CAN SEEK TO DIRECTLY
+# INSTEAD OF WALKING AND DISCARDING `OFFSET` ROWS.
+
+
+def _to_json(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """Encode the sort key values of a row into an opaque cursor string."""
+    raw = json.dumps([_to_json(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: type) -> tuple:
+    """Decode a cursor produced by `encode_cursor`, coercing each value to the given type."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("cursor shape mismatch")
+        decoded = []
+        for value, type_ in zip(values, types):
+            if type_ is datetime:
+                decoded.append(datetime.fromisoformat(value))
+            elif value is None:
+                decoded.append(None)
+            else:
+                decoded.append(type_(value))
+        return tuple(decoded)
+    except (ValueError, TypeError, json.JSONDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def keyset_after(columns: Sequence, values: Sequence):
+    """Row-value comparison `(a, b) > (:a, :b)`, which Postgres answers with a composite index seek."""
+    return tuple_(*columns) > tuple_(*values)
+
+
+def set_link_header(request: Request, response: Response, next_cursor: Optional[str]) -> None:
+    """Advertise the next page as an RFC 8288 Link header."""
+    if next_cursor is None:
+        return
+    next_url = request.url.remove_query_params("skip").include_query_params(cursor=next_cursor)
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
+
+
+def page_response(request: Request, items: Sequence, item_type: Any, next_cursor: Optional[str], as_page: bool) -> Response:
+    """One page of `items` as a {items, next_cursor} Page or a bare list, serialized on the fast path."""
+    if as_page:
+        response = json_response({"items": items, "next_cursor": next_cursor}, Page[item_type])
+    else:
+        response = json_response(items, List[item_type])
+    set_link_header(request, response, next_cursor)
+    return response
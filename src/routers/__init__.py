@@ -1,10 +1,13 @@
 from . import attendees 
+from . import categories
+from . import debug
 from . import events     
 from . import registrations 
 
 __all__ = [
     'attendees',
     'categories',
+    'debug',
     'events',
     'registrations'
 ]
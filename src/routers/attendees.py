@@ -1,36 +1,105 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from typing import List, Optional
+from sqlalchemy import func, or_
+import re
+from typing import List, Literal, Optional, Union
 from uuid import UUID
+from datetime import datetime
 from sqlalchemy.orm import selectinload
-from ..db.main import get_db
+from ..config import Config
+from ..database import get_db, get_read_db
 from ..models import models
-from ..schemas import Attendee, AttendeeCreate, AttendeeWithRegistrations
+from ..pagination import decode_cursor, encode_cursor, keyset_after, page_response
+from ..records import field_names, records, select_for
+from ..fields import FieldSet, load_columns, partial, sparse_fields, wants
+from ..schemas import Attendee, AttendeeCreate, AttendeeImportResult, AttendeeWithRegistrations, Page
+from ..serialization import json_response
+from ..services import attendee_import
+from ..streaming import stream_json
 
 router = APIRouter()
-# GET ATTENDEES WITH OPTIONAL FILTERS BY EMAIL AND PHONE, OFFSET AND LIMIT APPLIED.
-@router.get("", response_model=List[Attendee])
+
+
+def _digits(value: str) -> str:
+    # MATCHES THE phone_digits GENERATED COLUMN: regexp_replace(phone, '[^0-9]', '', 'g')
+    return re.sub(r"[^0-9]", "", value)
+
+
+# GET ATTENDEES WITH OPTIONAL FILTERS BY EMAIL AND PHONE.
+# PAGES ARE ORDERED BY (created_at, id). PASSING `cursor` (EMPTY FOR THE FIRST PAGE) SWITCHES TO KEYSET
+# PAGINATION AND A {items, next_cursor} BODY; WITHOUT IT THE LEGACY skip/limit LIST IS RETURNED.
+# `search` SWITCHES TO TRIGRAM SEARCH OVER EMAIL AND PHONE DIGITS, RANKED BY SIMILARITY (skip/limit PAGED).
+# `stream` IGNORES skip/limit AND STREAMS ALL ROWS AFTER THE CURSOR IN KEYSET ORDER (SEE src/streaming.py).
+@router.get("", response_model=Union[Page[Attendee], List[Attendee]])
 async def list_attendees(
+    request: Request,
     email: Optional[str] = None,
     phone: Optional[str] = None,
-    skip: int = 0,
-    limit: int = 100,
-    db: AsyncSession = Depends(get_db),
+    search: Optional[str] = Query(None, min_length=3, description="Substring of an email or phone number, ranked by similarity"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; empty for the first page"),
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=Config.MAX_PAGE_SIZE),
+    stream: bool = Query(False, description="Send every matching row after the cursor as one streamed JSON array"),
+    fields: FieldSet = Depends(sparse_fields(Attendee)),
+    db: AsyncSession = Depends(get_read_db),
 ):
     """
     GET /attendees
-    List all attendees, with optional filters by email or phone.
+    List all attendees, with optional filters by email or phone, or a ranked trigram search.
     """
-    query = select(models.Attendee)
+    sort_key = (models.Attendee.created_at, models.Attendee.id)
+    item_type = partial(Attendee, fields)
+    # THE CURSOR NEEDS THE SORT KEY, WHETHER OR NOT IT WAS ASKED FOR
+    names = field_names(Attendee, fields, also=("created_at", "id"))
+    query = select_for(models.Attendee, names)
 
+    # SUBSTRING FILTERS: LIKE '%x%' IS SERVED BY THE gin_trgm_ops INDEXES RATHER THAN A SEQUENTIAL SCAN
     if email:
-        query = query.where(models.Attendee.email.contains(email))
+        query = query.where(models.Attendee.email.contains(email, autoescape=True))
     if phone:
-        query = query.where(models.Attendee.phone.contains(phone))
+        phone_digits = _digits(phone)
+        if phone_digits:
+            query = query.where(models.Attendee.phone_digits.contains(phone_digits))
+        else:
+            query = query.where(models.Attendee.phone.contains(phone, autoescape=True))
+
+    if search:
+        if cursor is not None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Cursor pagination is not supported with search; use skip and limit",
+            )
+        if stream:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Streaming is not supported with search")
+        search_digits = _digits(search)
+        matches = [models.Attendee.email.icontains(search, autoescape=True)]
+        rank = func.similarity(models.Attendee.email, search)
+        if len(search_digits) >= 3:
+            matches.append(models.Attendee.phone_digits.contains(search_digits))
+            rank = func.greatest(rank, func.similarity(models.Attendee.phone_digits, search_digits))
+        query = query.where(or_(*matches)).order_by(rank.desc(), models.Attendee.id)
+        result = await db.execute(query.offset(skip).limit(limit))
+        return json_response(records(result, names), List[item_type])
 
-    result = await db.execute(query.offset(skip).limit(limit))
-    return result.scalars().all()
+    if cursor:
+        query = query.where(keyset_after(sort_key, decode_cursor(cursor, datetime, UUID)))
+    if stream:
+        return stream_json(db, query.order_by(*sort_key), names, item_type)
+    if cursor is None and skip:
+        query = query.offset(skip)
+
+    # FETCH ONE EXTRA ROW TO LEARN WHETHER A NEXT PAGE EXISTS WITHOUT A COUNT QUERY
+    result = await db.execute(query.order_by(*sort_key).limit(limit + 1))
+    attendees = records(result, names)
+
+    next_cursor = None
+    if len(attendees) > limit:
+        attendees = attendees[:limit]
+        last = attendees[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return page_response(request, attendees, item_type, next_cursor, as_page=cursor is not None)
 
 
 # CREATE NEW ATTENDEE WITH UNIQUE EMAIL CHECK BEFORE INSERTING
@@ -58,33 +127,88 @@ async def create_attendee(
     return new_attendee
 
 
+# BULK IMPORT FROM A CSV (HEADER ROW REQUIRED) OR NDJSON UPLOAD. THE BODY IS STREAMED, NOT BUFFERED.
+# ROWS ARE MERGED ON EMAIL: NEW EMAILS ARE INSERTED, EXISTING ATTENDEES ARE UPDATED.
+@router.post("/import", response_model=AttendeeImportResult)
+async def import_attendees(
+    request: Request,
+    format: Optional[Literal["csv", "ndjson"]] = Query(
+        None, description="Defaults to ndjson for application/x-ndjson uploads, csv otherwise"
+    ),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    POST /attendees/import
+    Bulk create or update attendees from a CSV or NDJSON upload.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        format = "ndjson" if "ndjson" in content_type or "jsonl" in content_type else "csv"
+
+    summary = await attendee_import.import_attendees(db, request.stream(), format)
+    await db.commit()
+
+    return AttendeeImportResult(
+        import_id=summary.import_id,
+        rows=summary.rows,
+        inserted=summary.inserted,
+        updated=summary.updated,
+        failed=summary.failed,
+        error_report_url=(
+            str(request.url_for("get_attendee_import_errors", import_id=summary.import_id))
+            if summary.error_report else None
+        ),
+    )
+
+
+# DOWNLOAD THE REJECTED ROWS OF AN IMPORT AS CSV (line, error, row)
+@router.get("/import/{import_id}/errors", response_class=FileResponse)
+async def get_attendee_import_errors(import_id: str):
+    """
+    GET /attendees/import/{import_id}/errors
+    Download the error report of an attendee import.
+    """
+    path = attendee_import.error_report_path(import_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Import error report not found")
+    return FileResponse(path, media_type="text/csv", filename=f"attendee-import-{import_id}-errors.csv")
+
+
 # FETCH ATTENDEE PROFILE WITH REGISTRATIONS AND EVENTS.
 @router.get("/{attendee_id}", response_model=AttendeeWithRegistrations)
 async def get_attendee_profile(
     attendee_id: UUID,
-    db: AsyncSession = Depends(get_db), 
+    fields: FieldSet = Depends(sparse_fields(AttendeeWithRegistrations)),
+    db: AsyncSession = Depends(get_read_db), 
 ):
     """
     GET /attendees/{attendee_id}
     Get attendee profile with event history and registrations.
     """
-    result = await db.execute(
-        select(models.Attendee).where(models.Attendee.id == attendee_id)
-    )
+    query = select(models.Attendee).where(models.Attendee.id == attendee_id)
+    columns = load_columns(models.Attendee, fields)
+    if columns is not None:
+        query = query.options(columns)
+    result = await db.execute(query)
     attendee = result.scalar_one_or_none()
 
     if not attendee:
         raise HTTPException(status_code=404, detail="Attendee not found")
 
-    registrations_result = await db.execute(
-        select(models.Registration)
-        .where(models.Registration.attendee_id == attendee_id)
-        .options(selectinload(models.Registration.event))
-    )
-    registrations = registrations_result.scalars().all()
+    # THE HISTORY QUERIES ONLY RUN FOR THE PARTS OF IT THAT ?fields= ASKED FOR
+    registrations = []
+    if wants(fields, "registrations", "events"):
+        history = select(models.Registration).where(models.Registration.attendee_id == attendee_id)
+        if wants(fields, "events"):
+            history = history.options(selectinload(models.Registration.event))
+        registrations_result = await db.execute(history)
+        registrations = registrations_result.scalars().all()
 
-    return AttendeeWithRegistrations(
-        **attendee.__dict__,
-        registrations=registrations,
-        events=[registration.event for registration in registrations],
+    return json_response(
+        {
+            **attendee.__dict__,
+            "registrations": registrations if wants(fields, "registrations") else [],
+            "events": [registration.event for registration in registrations] if wants(fields, "events") else [],
+        },
+        partial(AttendeeWithRegistrations, fields),
     )
\ No newline at end of file
@@ -1,24 +1,34 @@
 from sqlalchemy.exc import IntegrityError  
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from uuid import UUID
-from ..db.main import get_db
+from ..database import get_db, get_read_db
 from ..models import models  
 from typing import List
 from ..schemas.category import Category, CategoryCreate, CategoryBase
+from ..fields import FieldSet, partial, sparse_fields
+from ..records import field_names, records, select_for
+from ..serialization import json_response
+from ..streaming import stream_json
 
 router = APIRouter()
-# GET ALL CATEGORIES FROM DB
+# GET ALL CATEGORIES FROM DB, BY NAME
 @router.get("", response_model=List[Category])
-async def list_categories(db: AsyncSession = Depends(get_db)):
-    result = await db.execute(select(models.Category))
-    categories = result.scalars().all()
-    # EXPLICITLY LOAD EVENTS IF NEEDED (OPTIONAL)
-    for category in categories:
-        await db.refresh(category, attribute_names=['id', 'name', 'description', 'created_at', 'updated_at'])
-    
-    return categories
+async def list_categories(
+    stream: bool = Query(False, description="Send the categories as one streamed JSON array"),
+    fields: FieldSet = Depends(sparse_fields(Category)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    # CORE SELECT OF JUST THE RESPONSE COLUMNS: NO ORM INSTANCES AND NO selectin LOAD OF EVERY CATEGORY'S EVENTS
+    item_type = partial(Category, fields)
+    names = field_names(Category, fields)
+    query = select_for(models.Category, names).order_by(models.Category.name)
+    if stream:
+        return stream_json(db, query, names, item_type)
+
+    result = await db.execute(query)
+    return json_response(records(result, names), List[item_type])
 
 # ENDPOINT TO CREATE A NEW CATEGORY IN THE DATABASE.
 @router.post("", response_model=Category, status_code=status.HTTP_201_CREATED)
@@ -0,0 +1,23 @@
+from fastapi import APIRouter
+from ..database import engines
+from .. import slow_queries
+
+router = APIRouter()
+
+# CONNECTION POOL INTROSPECTION FOR TUNING THE DB_POOL_* SETTINGS (PER WORKER PROCESS)
+@router.get("/pool")
+async def pool_status():
+    """
+    GET /debug/pool
+    Live size, checked-in/checked-out and overflow counts, plus the configured limits, for each engine.
+    """
+    return engines.pool_status()
+
+# RECENT STATEMENTS OVER SLOW_QUERY_MS WITH THEIR PLANS (PER WORKER PROCESS)
+@router.get("/slow-queries")
+async def list_slow_queries():
+    """
+    GET /debug/slow-queries
+    Newest first: duration, route, request id, statement, redacted parameters and the EXPLAIN output.
+    """
+    return slow_queries.entries()
@@ -1,96 +1,229 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import and_
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from uuid import UUID
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Union
+from src.config import Config
 from src.schemas import event as schemas
-from src.database import get_db 
+from src.schemas.page import Page
+from src.database import get_db, get_read_db
+from src.pagination import decode_cursor, encode_cursor, keyset_after, page_response
+from src.records import field_names, records, select_for
+from src.fields import FieldSet, load_columns, partial, sparse_fields, wants
+from src.serialization import json_response
+from src.streaming import stream_json
 from src.models import models
 from src.schemas.attendee import Attendee 
+from src.services import registrations as registration_service
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
+from sqlalchemy import select, func
+from sqlalchemy.dialects.postgresql import TSTZRANGE
 
 router = APIRouter()
 
-@router.get("", response_model=List[schemas.Event])
-async def list_events(
+# SORT -> (COLUMN, CURSOR VALUE TYPE); EVERY ORDER IS (column, id) SO THE KEY IS UNIQUE AND INDEX-BACKED
+_EVENT_SORTS = {
+    schemas.EventSort.START_DATE: (models.Event.start_date, datetime),
+    schemas.EventSort.CREATED_AT: (models.Event.created_at, datetime),
+    schemas.EventSort.TITLE: (models.Event.title, str),
+}
+
+
+def _filter_events(
+    query,
     category_id: Optional[UUID] = None,
     is_active: Optional[bool] = None,
     start_date: Optional[datetime] = None,
     end_date: Optional[datetime] = None,
-    db: AsyncSession = Depends(get_db)  
+    mode: schemas.EventDateMode = schemas.EventDateMode.WITHIN,
 ):
-    """
-    GET /events
-    List all events with optional filters.
-    """
-    query = select(models.Event)
-    
     # FILTER BY CATEGORY ID IF PROVIDED
     if category_id:
         query = query.where(models.Event.category_id == category_id)
     # FILTER BY ACTIVE STATUS IF PROVIDED
     if is_active is not None:
         query = query.where(models.Event.is_active == is_active)
-    # FILTER BY EVENTS OCCURRING WITHIN THE SPECIFIED START AND END DATES
-    if start_date and end_date:
-        query = query.where(
-            and_(
-                models.Event.start_date >= start_date,
-                models.Event.end_date <= end_date
-            )
-        )
-    result = await db.execute(query)
-    return result.scalars().all() 
+    # FILTER BY THE DATE WINDOW; A MISSING BOUND LEAVES THAT SIDE OPEN
+    if start_date is None and end_date is None:
+        return query
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="start_date must not be after end_date")
+    if mode == schemas.EventDateMode.STARTS_WITHIN:
+        # PLAIN B-TREE RANGE ON start_date
+        if start_date:
+            query = query.where(models.Event.start_date >= start_date)
+        if end_date:
+            query = query.where(models.Event.start_date <= end_date)
+        return query
+    # RANGE OPERATORS ON THE GENERATED during COLUMN, SERVED BY ITS GiST INDEX
+    window = func.tstzrange(start_date, end_date, "[]", type_=TSTZRANGE)
+    if mode == schemas.EventDateMode.OVERLAPS:
+        return query.where(models.Event.during.overlaps(window))
+    if mode == schemas.EventDateMode.CONTAINS:
+        return query.where(models.Event.during.contains(window))
+    return query.where(models.Event.during.contained_by(window))
+
+
+# GET EVENTS WITH OPTIONAL FILTERS, ONE PAGE AT A TIME.
+# PAGES ARE ORDERED BY (sort, id). PASSING `cursor` (EMPTY FOR THE FIRST PAGE) RETURNS A {items, next_cursor}
+# BODY; WITHOUT IT THE FIRST PAGE IS RETURNED AS A PLAIN LIST. EITHER WAY THE NEXT PAGE IS IN THE Link HEADER.
+# `stream` IGNORES limit AND STREAMS ALL REMAINING ROWS IN THE SAME ORDER (SEE src/streaming.py).
+@router.get("", response_model=Union[Page[schemas.Event], List[schemas.Event]])
+async def list_events(
+    request: Request,
+    category_id: Optional[UUID] = None,
+    is_active: Optional[bool] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    mode: schemas.EventDateMode = Query(
+        schemas.EventDateMode.WITHIN,
+        description="How start_date/end_date match the event's span; either bound may be omitted",
+    ),
+    sort: schemas.EventSort = schemas.EventSort.START_DATE,
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; empty for the first page"),
+    limit: int = Query(100, ge=1, le=Config.MAX_PAGE_SIZE),
+    stream: bool = Query(False, description="Send every matching row after the cursor as one streamed JSON array"),
+    fields: FieldSet = Depends(sparse_fields(schemas.Event)),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    GET /events
+    List events with optional filters, sorted by start_date, created_at or title.
+    """
+    sort_column, value_type = _EVENT_SORTS[sort]
+    sort_key = (sort_column, models.Event.id)
+    item_type = partial(schemas.Event, fields)
+    # THE CURSOR NEEDS THE SORT KEY, WHETHER OR NOT IT WAS ASKED FOR
+    names = field_names(schemas.Event, fields, also=(sort.value, "id"))
+    query = _filter_events(select_for(models.Event, names), category_id, is_active, start_date, end_date, mode)
+
+    if cursor:
+        # THE CURSOR CARRIES ITS SORT, SO ONE TAKEN UNDER A DIFFERENT ORDER IS REJECTED RATHER THAN MISREAD
+        cursor_sort, *values = decode_cursor(cursor, str, value_type, UUID)
+        if cursor_sort != sort.value:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor does not match sort")
+        query = query.where(keyset_after(sort_key, values))
+    if stream:
+        return stream_json(db, query.order_by(*sort_key), names, item_type)
+
+    # FETCH ONE EXTRA ROW TO LEARN WHETHER A NEXT PAGE EXISTS WITHOUT A COUNT QUERY
+    result = await db.execute(query.order_by(*sort_key).limit(limit + 1))
+    events = records(result, names)
+
+    next_cursor = None
+    if len(events) > limit:
+        events = events[:limit]
+        last = events[-1]
+        next_cursor = encode_cursor(sort.value, getattr(last, sort.value), last.id)
+    return page_response(request, events, item_type, next_cursor, as_page=cursor is not None)
+
+# DECLARED BEFORE /{event_id} SO "search" IS NOT PARSED AS AN EVENT ID
+@router.get("/search", response_model=List[schemas.EventSearchResult])
+async def search_events(
+    q: str = Query(..., min_length=1, description="Web-search style query: words, \"quoted phrases\", -excluded"),
+    category_id: Optional[UUID] = None,
+    is_active: Optional[bool] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    mode: schemas.EventDateMode = schemas.EventDateMode.WITHIN,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100),
+    fields: FieldSet = Depends(sparse_fields(schemas.EventSearchResult)),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    GET /events/search
+    Full-text search over event titles and descriptions, best matches first, with highlighted snippets.
+    """
+    ts_query = func.websearch_to_tsquery("english", q)
+    rank = func.ts_rank(models.Event.search_vector, ts_query)
+
+    # RANK AND PAGE USING THE GIN INDEX FIRST; ts_headline RE-PARSES THE TEXT, SO ONLY RUN IT FOR THE PAGE
+    ranked = _filter_events(
+        select(models.Event.id, rank.label("rank")).where(models.Event.search_vector.op("@@")(ts_query)),
+        category_id, is_active, start_date, end_date, mode,
+    ).order_by(rank.desc(), models.Event.id).offset(skip).limit(limit).subquery()
+
+    # rank IS ALWAYS SELECTED FOR THE ORDER; THE SNIPPET IS ONLY COMPUTED WHEN IT IS WANTED
+    event_fields = None if fields is None else tuple(name for name in fields if name in schemas.Event.model_fields)
+    names = field_names(schemas.Event, event_fields)
+    columns = [getattr(models.Event, name) for name in names] + [ranked.c.rank]
+    names += ("rank",)
+    if wants(fields, "snippet"):
+        columns.append(func.ts_headline(
+            "english",
+            func.coalesce(models.Event.description, models.Event.title),
+            ts_query,
+            "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=10",
+        ).label("snippet"))
+        names += ("snippet",)
+    result = await db.execute(
+        select(*columns)
+        .select_from(models.Event)
+        .join(ranked, ranked.c.id == models.Event.id)
+        .order_by(ranked.c.rank.desc(), models.Event.id)
+    )
+    return json_response(records(result, names), List[partial(schemas.EventSearchResult, fields)])
 
 @router.post("", response_model=schemas.Event, status_code=status.HTTP_201_CREATED)
-def create_event(event_data: schemas.EventCreate, db: Session = Depends(get_db)):
+async def create_event(event_data: schemas.EventCreate, db: AsyncSession = Depends(get_db)):
     """
     POST /events
     Create a new event.
     """
-    # VERIFY THE CATEGORY EXISTS
-    category = db.query(models.Category).filter(models.Category.id == event_data.category_id).first()
+    # VERIFY THE CATEGORY EXISTS (ID ONLY: LOADING A Category WOULD SELECTIN-LOAD ALL OF ITS EVENTS)
+    result = await db.execute(select(models.Category.id).where(models.Category.id == event_data.category_id))
     
-    if not category:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Category not found")
     
     new_event = models.Event(**event_data.model_dump())
     db.add(new_event)
-    db.commit()
-    db.refresh(new_event)
+    await db.commit()
+    await db.refresh(new_event)
     return new_event
 
 @router.get("/{event_id}", response_model=schemas.EventWithAttendees)
-def get_event_details(event_id: UUID, db: Session = Depends(get_db)):
+async def get_event_details(
+    event_id: UUID,
+    fields: FieldSet = Depends(sparse_fields(schemas.EventWithAttendees)),
+    db: AsyncSession = Depends(get_read_db),
+):
     """
     GET /events/{event_id}
     Get specific event details with current attendees.
     """
-    event = db.query(models.Event).filter(models.Event.id == event_id).first()
+    query = select(models.Event).where(models.Event.id == event_id)
+    columns = load_columns(models.Event, fields)
+    if columns is not None:
+        query = query.options(columns)
+    result = await db.execute(query)
+    event = result.scalar_one_or_none()
     
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
     
-    # LOAD ALL EVENT ATTENDEES FOR THIS EVENT
-    event_attendees = db.query(models.Registration).filter(models.Registration.event_id == event_id).all()
+    # LOAD ALL EVENT ATTENDEES FOR THIS EVENT, UNLESS THEY WERE LEFT OUT OF ?fields=
+    event_attendees = []
+    if wants(fields, "event_attendees"):
+        result = await db.execute(select(models.Registration).where(models.Registration.event_id == event_id))
+        event_attendees = result.scalars().all()
     
     # CREATE A DICTIONARY FROM THE EVENT OBJECT - to ensure proper API serialization
     event_dict = {k: v for k, v in event.__dict__.items() if not k.startswith('_')}
     # RETURN EVENT WITH ATTENDEES SCHEMA
-    return schemas.EventWithAttendees(
-        **event_dict,
-        event_attendees=event_attendees
+    return json_response(
+        {**event_dict, "event_attendees": event_attendees},
+        partial(schemas.EventWithAttendees, fields),
     )
 
 @router.put("/{event_id}", response_model=schemas.Event)
-def update_event(event_id: UUID, event_update: schemas.EventUpdate, db: Session = Depends(get_db)):
+async def update_event(event_id: UUID, event_update: schemas.EventUpdate, db: AsyncSession = Depends(get_db)):
     """
     PUT /events/{event_id}
     Update event details (e.g., max_capacity, is_active, etc.).
     """
-    event = db.query(models.Event).filter(models.Event.id == event_id).first()
+    result = await db.execute(select(models.Event).where(models.Event.id == event_id))
+    event = result.scalar_one_or_none()
     
     if not event:
         raise HTTPException(status_code=404, detail="Event not found")
@@ -99,30 +232,44 @@ def update_event(event_id: UUID, event_update: schemas.EventUpdate, db: Session
     update_data = event_update.model_dump(exclude_unset=True)
     for key, value in update_data.items():
         setattr(event, key, value)
+    await db.flush()
+
+    # A RAISED max_capacity MAY HAVE OPENED SEATS FOR THE WAITLIST
+    if "max_capacity" in update_data:
+        await registration_service.promote_waitlisted(db, event_id)
     
-    db.commit()
-    db.refresh(event)
+    await db.commit()
+    await db.refresh(event)
     return event
 
 @router.get("/{event_id}/attendees", response_model=List[Attendee])
-def list_event_attendees(
+async def list_event_attendees(
     event_id: UUID,
     status: Optional[str] = None,
-    db: Session = Depends(get_db)
+    stream: bool = Query(False, description="Send the attendees as one streamed JSON array"),
+    fields: FieldSet = Depends(sparse_fields(Attendee)),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     GET /events/{event_id}/attendees
     List all attendees for a specific event, optionally filtered by registration status.
     """
-    event = db.query(models.Event).filter(models.Event.id == event_id).first()
+    result = await db.execute(select(models.Event.id).where(models.Event.id == event_id))
     
-    if not event:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(status_code=404, detail="Event not found")
     
-    query = db.query(models.Attendee).join(models.Registration)
-    query = query.filter(models.Registration.event_id == event_id)
+    item_type = partial(Attendee, fields)
+    names = field_names(Attendee, fields)
+    query = select_for(models.Attendee, names).join(models.Registration)
+    query = query.where(models.Registration.event_id == event_id)
     
     if status:
-        query = query.filter(models.Registration.status == status)
+        query = query.where(models.Registration.status == status)
+    # ONE ORDER FOR BOTH RESPONSES, SO A STREAMED LIST MATCHES THE BUFFERED ONE
+    query = query.order_by(models.Attendee.created_at, models.Attendee.id)
+    if stream:
+        return stream_json(db, query, names, item_type)
     
-    return query.all()
\ No newline at end of file
+    result = await db.execute(query)
+    return json_response(records(result, names), List[item_type])
\ No newline at end of file
@@ -1,77 +1,202 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from uuid import UUID
-from typing import List
-from src.database import get_db
-from src.models.models import Registration, Event, Attendee
+from datetime import datetime
+from typing import List, Literal, Optional, Union
+from src.config import Config
+from src.database import engines, get_db, get_read_db
+from src.pagination import decode_cursor, encode_cursor, keyset_after, page_response
+from src.records import field_names, records, select_for
+from src.fields import FieldSet, load_columns, partial, sparse_fields
+from src.models.models import Registration, RegistrationStatus
 from src.schemas.registration import Registration as RegistrationSchema
-from src.schemas.registration import RegistrationCreate, RegistrationUpdate
+from src.schemas.registration import RegistrationStatus as RegistrationStatusSchema
+from src.schemas.registration import RegistrationCreate, RegistrationUpdate, WaitlistPosition
+from src.schemas.registration import BulkRegistrationCreate, BulkRegistrationResponse, BulkRegistrationResult
+from src.schemas.page import Page
+from src.services import registration_export
+from src.services import registrations as registration_service
+from src.serialization import json_response
+from src.streaming import stream_json
 
 router = APIRouter()
 
 
-@router.get("", response_model=List[RegistrationSchema])
-# LIST REGISTRATIONS
-async def list_registrations(db: AsyncSession = Depends(get_db)):
-    """List all registrations."""
-    result = await db.execute(select(Registration))
-    registrations = result.scalars().all()  
-    return registrations
+# LIST REGISTRATIONS WITH OPTIONAL FILTERS, ONE PAGE AT A TIME.
+# PAGES ARE ORDERED BY (created_at, id); EACH FILTER HAS AN INDEX LEADING WITH ITS COLUMN AND ENDING IN THAT ORDER.
+# PASSING `cursor` (EMPTY FOR THE FIRST PAGE) RETURNS A {items, next_cursor} BODY; WITHOUT IT THE FIRST PAGE IS
+# RETURNED AS A PLAIN LIST. EITHER WAY THE NEXT PAGE IS IN THE Link HEADER.
+# `stream` IGNORES limit AND STREAMS ALL REMAINING ROWS IN THE SAME ORDER (SEE src/streaming.py).
+@router.get("", response_model=Union[Page[RegistrationSchema], List[RegistrationSchema]])
+async def list_registrations(
+    request: Request,
+    event_id: Optional[UUID] = None,
+    attendee_id: Optional[UUID] = None,
+    status_filter: Optional[RegistrationStatusSchema] = Query(None, alias="status"),
+    created_from: Optional[datetime] = Query(None, description="Only registrations created at or after this time"),
+    created_to: Optional[datetime] = Query(None, description="Only registrations created at or before this time"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from a previous page's next_cursor; empty for the first page"),
+    limit: int = Query(100, ge=1, le=Config.MAX_PAGE_SIZE),
+    stream: bool = Query(False, description="Send every matching row after the cursor as one streamed JSON array"),
+    fields: FieldSet = Depends(sparse_fields(RegistrationSchema)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """
+    GET /registrations
+    List registrations, optionally filtered by event, attendee, status and creation time.
+    """
+    if created_from and created_to and created_from > created_to:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="created_from must not be after created_to")
 
-#
+    sort_key = (Registration.created_at, Registration.id)
+    item_type = partial(RegistrationSchema, fields)
+    # THE CURSOR NEEDS THE SORT KEY, WHETHER OR NOT IT WAS ASKED FOR
+    names = field_names(RegistrationSchema, fields, also=("created_at", "id"))
+    query = select_for(Registration, names)
+    if event_id:
+        query = query.where(Registration.event_id == event_id)
+    if attendee_id:
+        query = query.where(Registration.attendee_id == attendee_id)
+    if status_filter:
+        query = query.where(Registration.status == status_filter.value)
+    if created_from:
+        query = query.where(Registration.created_at >= created_from)
+    if created_to:
+        query = query.where(Registration.created_at <= created_to)
+    if cursor:
+        query = query.where(keyset_after(sort_key, decode_cursor(cursor, datetime, UUID)))
+    if stream:
+        return stream_json(db, query.order_by(*sort_key), names, item_type)
+
+    # FETCH ONE EXTRA ROW TO LEARN WHETHER A NEXT PAGE EXISTS WITHOUT A COUNT QUERY
+    result = await db.execute(query.order_by(*sort_key).limit(limit + 1))
+    registrations = records(result, names)
+
+    next_cursor = None
+    if len(registrations) > limit:
+        registrations = registrations[:limit]
+        last = registrations[-1]
+        next_cursor = encode_cursor(last.created_at, last.id)
+    return page_response(request, registrations, item_type, next_cursor, as_page=cursor is not None)
+
+# EXPORT REGISTRATIONS: COPY OUTPUT STREAMED TO THE CLIENT. parallel > 1 COPIES TABLE SLICES ON SEVERAL
+# CONNECTIONS THAT SHARE ONE EXPORTED SNAPSHOT, SO THE FILE IS STILL ONE CONSISTENT POINT-IN-TIME VIEW. parallel IS
+# AN UPPER BOUND: ALL EXPORTS TOGETHER USE AT MOST EXPORT_MAX_CONNECTIONS PRIMARY CONNECTIONS. ?fields= NARROWS THE
+# COPY TO THOSE COLUMNS, VALIDATED AGAINST THE REGISTRATION SCHEMA LIKE THE LIST ROUTES' ?fields=.
+@router.get("/export", response_class=StreamingResponse)
+async def export_registrations(
+    format: Literal["csv", "ndjson"] = "csv",
+    gzip: bool = False,
+    parallel: int = Query(1, ge=1, le=8, description="Number of connections copying slices of the table"),
+    event_id: Optional[UUID] = None,
+    status: Optional[RegistrationStatusSchema] = None,
+    fields: FieldSet = Depends(sparse_fields(RegistrationSchema)),
+):
+    """Export registrations as CSV or NDJSON, optionally gzip-compressed."""
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"registrations.{format}"
+    if gzip:
+        media_type, filename = "application/gzip", f"{filename}.gz"
+
+    return StreamingResponse(
+        registration_export.stream_export(
+            engines.primary,
+            event_id=event_id,
+            status=status.value if status else None,
+            fmt=format,
+            parallel=parallel,
+            compress=gzip,
+            fields=fields,
+        ),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+# CREATE REGISTRATION: EXISTENCE, DUPLICATE AND CAPACITY CHECKS PLUS THE INSERT RUN AS ONE STATEMENT.
+# A REGISTERED/CONFIRMED REQUEST FOR A FULL EVENT IS STORED AS WAITLISTED INSTEAD.
 @router.post("", response_model=RegistrationSchema, status_code=status.HTTP_201_CREATED)
 async def create_registration(reg_data: RegistrationCreate, db: AsyncSession = Depends(get_db)):
     """Create a new event registration."""
-    
-    # CREATE REGISTRATION
-    # CHECK IF EVENT EXISTS
-    result = await db.execute(select(Event).filter(Event.id == reg_data.event_id))
-    event = result.scalar_one_or_none()
-    if not event:
+    outcome = await registration_service.register(
+        db, reg_data.event_id, reg_data.attendee_id, reg_data.status.value
+    )
+    if not outcome.event_found:
         raise HTTPException(status_code=404, detail="Event not found")
-
-    # CHECK IF ATTENDEE EXISTS
-    result = await db.execute(select(Attendee).filter(Attendee.id == reg_data.attendee_id))
-    attendee = result.scalar_one_or_none()
-    if not attendee:
+    if not outcome.attendee_found:
         raise HTTPException(status_code=404, detail="Attendee not found")
-
-    # ENSURE NO DUPLICATES: ATTENDEE IS ALREADY REGISTERED FOR THE EVENT
-    result = await db.execute(select(Registration).filter(
-        Registration.event_id == reg_data.event_id,
-        Registration.attendee_id == reg_data.attendee_id
-    ))
-    existing_registration = result.scalar_one_or_none()
-
-    if existing_registration:
+    if outcome.duplicate:
+        await db.commit()
         raise HTTPException(
             status_code=400,
             detail="Attendee is already registered for this event"
         )
 
-    # CREATE A NEW REGISTRATION
-    new_registration = Registration(
-        event_id=reg_data.event_id,
-        attendee_id=reg_data.attendee_id,
-        status=reg_data.status.value
-    )
+    await db.commit()
+    return outcome.registration
 
-    db.add(new_registration)
+# BULK REGISTRATION: VALIDATES AND INSERTS THE WHOLE BATCH SET-WISE, REPORTING A RESULT PER ITEM
+@router.post("/bulk", response_model=BulkRegistrationResponse)
+async def create_registrations_bulk(batch: BulkRegistrationCreate, db: AsyncSession = Depends(get_db)):
+    """Create many registrations at once; individual failures do not abort the batch."""
+    outcomes = await registration_service.register_many(db, batch.items)
     await db.commit()
-    await db.refresh(new_registration)
-    return new_registration
+
+    results = [
+        BulkRegistrationResult(
+            index=index,
+            status_code=outcome.status_code,
+            registration=RegistrationSchema.model_validate(outcome.registration) if outcome.registration else None,
+            detail=outcome.detail,
+        )
+        for index, outcome in enumerate(outcomes)
+    ]
+    created = sum(1 for result in results if result.status_code == status.HTTP_201_CREATED)
+    return BulkRegistrationResponse(created=created, failed=len(results) - created, results=results)
+
+# WAITLIST POSITION: 1 MEANS NEXT IN LINE FOR A FREED SEAT
+@router.get("/{registration_id}/waitlist", response_model=WaitlistPosition)
+async def get_waitlist_position(
+    registration_id: UUID,
+    fields: FieldSet = Depends(sparse_fields(WaitlistPosition)),
+    db: AsyncSession = Depends(get_read_db),
+):
+    """Get a waitlisted registration's position in its event's queue."""
+    row = await registration_service.waitlist_position(db, registration_id)
+    if row is None:
+        raise HTTPException(status_code=404, detail="Registration not found")
+    if row.status != RegistrationStatus.WAITLISTED.value:
+        raise HTTPException(status_code=404, detail="Registration is not on the waitlist")
+    # ONE FIXED QUERY COMPUTES THE POSITION; ?fields= ONLY NARROWS THE BODY HERE
+    return json_response(
+        {
+            "registration_id": registration_id,
+            "event_id": row.event_id,
+            "attendee_id": row.attendee_id,
+            "position": row.position,
+        },
+        partial(WaitlistPosition, fields),
+    )
 
 #GET REGISTRATION BY ID
 @router.get("/{registration_id}", response_model=RegistrationSchema)
-async def get_registration(registration_id: UUID, db: AsyncSession = Depends(get_db)):
+async def get_registration(
+    registration_id: UUID,
+    fields: FieldSet = Depends(sparse_fields(RegistrationSchema)),
+    db: AsyncSession = Depends(get_read_db),
+):
     """Get a specific registration by ID."""
-    result = await db.execute(select(Registration).filter(Registration.id == registration_id))
+    query = select(Registration).filter(Registration.id == registration_id)
+    columns = load_columns(Registration, fields)
+    if columns is not None:
+        query = query.options(columns)
+    result = await db.execute(query)
     registration = result.scalar_one_or_none()
 
     if not registration:
         raise HTTPException(status_code=404, detail="Registration not found")
-    return registration
+    return json_response(registration, partial(RegistrationSchema, fields))
 
 
 @router.patch("/{registration_id}", response_model=RegistrationSchema)
@@ -84,9 +209,37 @@ async def update_registration_status(
 
     if not registration:
         raise HTTPException(status_code=404, detail="Registration not found")
+    # ROW LOCKS, EVENT FIRST (SEE registration_service.lock_event): TWO CONCURRENT STATUS CHANGES MUST NOT BOTH
+    # CLAIM OR RELEASE THE SAME SEAT, AND THE STATUS IS RE-READ UNDER THE LOCK
+    await registration_service.lock_event(db, registration.event_id)
+    await db.refresh(registration, with_for_update=True)
+
+    # KEEP THE EVENT'S SEAT COUNT IN STEP WHEN THE STATUS MOVES IN OR OUT OF A SEAT-HOLDING STATE
+    new_status = status_update.status.value
+    was_holding = registration_service.holds_seat(registration.status)
+    now_holding = registration_service.holds_seat(new_status)
+    if now_holding and not was_holding:
+        if not await registration_service.claim_seat(db, registration.event_id):
+            await db.rollback()
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Event is at full capacity")
+    elif was_holding and not now_holding:
+        await registration_service.release_seat(db, registration.event_id)
+
+    # UPDATE REGISTRATION STATUS; A MOVE ONTO THE WAITLIST JOINS THE BACK OF THE QUEUE
+    # (waitlist_seq IS SET EXACTLY WHILE THE REGISTRATION IS WAITLISTED)
+    left_seq = None
+    if new_status != RegistrationStatus.WAITLISTED.value:
+        left_seq, registration.waitlist_seq = registration.waitlist_seq, None
+    elif registration.waitlist_seq is None:
+        registration.waitlist_seq = await registration_service.join_waitlist(db, registration.event_id)
+    registration.status = new_status
+    await db.flush()
+    if left_seq is not None:
+        await registration_service.leave_waitlist(db, registration.event_id, left_seq)
 
-    # UPDATE REGISTRATION STATUS
-    registration.status = status_update.status.value
+    # A FREED SEAT GOES TO THE FRONT OF THE WAITLIST IN THE SAME TRANSACTION, NEVER BACK TO THIS REGISTRATION
+    if was_holding and not now_holding:
+        await registration_service.promote_waitlisted(db, registration.event_id, exclude_id=registration.id)
     await db.commit()
     await db.refresh(registration)
     return registration
@@ -100,7 +253,18 @@ async def delete_registration(registration_id: UUID, db: AsyncSession = Depends(
 
     if not registration:
         raise HTTPException(status_code=404, detail="Registration not found")
+    await registration_service.lock_event(db, registration.event_id)
+    await db.refresh(registration, with_for_update=True)
 
+    freed_seat = registration_service.holds_seat(registration.status)
+    if freed_seat:
+        await registration_service.release_seat(db, registration.event_id)
+    left_seq = registration.waitlist_seq
     await db.delete(registration)
+    await db.flush()
+    if left_seq is not None:
+        await registration_service.leave_waitlist(db, registration.event_id, left_seq)
+    if freed_seat:
+        await registration_service.promote_waitlisted(db, registration.event_id)
     await db.commit()
     return None
@@ -2,11 +2,13 @@ from .attendee import *
 from .category import *
 from .event import *
 from .registration import *
+from .page import *
 
 
 __all__ = [
     'attendee',
     'category',
     'event',
-    'registration'
+    'registration',
+    'page'
 ]
\ No newline at end of file
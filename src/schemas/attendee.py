@@ -1,7 +1,7 @@
 from __future__ import annotations
 from datetime import datetime, timezone
 from pydantic import BaseModel, EmailStr, ConfigDict, Field
-from typing import List, Optional, TYPE_CHECKING
+from typing import Annotated, List, Optional, TYPE_CHECKING
 import uuid
 
 # Import type definitions for type checking only
@@ -20,8 +20,18 @@ class AttendeeBase(BaseModel):
 class AttendeeCreate(AttendeeBase):
     pass  # Inherits everything from AttendeeBase
 
+# Schema for one row of a bulk import: AttendeeCreate bounded by the attendees column widths, so an over-long
+# value is reported as a rejected row instead of failing the COPY and with it the whole import
+class AttendeeImportRow(AttendeeCreate):
+    first_name: str = Field(max_length=50)
+    last_name: str = Field(max_length=50)
+    email: Annotated[EmailStr, Field(max_length=100)]
+    phone: str = Field(max_length=20)
+
 # Schema for an Attendee response (what gets returned from the API)
 class Attendee(AttendeeBase):
+    # STORED ADDRESSES WERE VALIDATED ON THE WAY IN; RE-RUNNING EmailStr ON EVERY RESPONSE ROW DOMINATES ITS CPU COST
+    email: str
     id: uuid.UUID
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: Optional[datetime] = None
@@ -41,6 +51,15 @@ class AttendeeWithRegistrations(Attendee):
     
     model_config = ConfigDict(from_attributes=True)
 
+# Schema for the summary of a bulk attendee import
+class AttendeeImportResult(BaseModel):
+    import_id: str
+    rows: int
+    inserted: int
+    updated: int
+    failed: int
+    error_report_url: Optional[str] = None
+
 # Import at runtime to resolve forward references
 from .event import Event
 from .registration import Registration
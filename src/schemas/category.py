@@ -1,10 +1,5 @@
-from pydantic import BaseModel, ConfigDict, field_serializer
-from typing import Optional
-from uuid import UUID
-from datetime import datetime 
-
 # SCHEMA DEFINITIONS FOR HANDLING CATEGORY DATA
-from pydantic import BaseModel, ConfigDict, field_serializer
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from uuid import UUID
 from datetime import datetime 
@@ -22,7 +17,3 @@ class Category(CategoryBase):
     updated_at: datetime
 
     model_config = ConfigDict(from_attributes=True)
-
-    @field_serializer('created_at', 'updated_at')
-    def serialize_datetime(self, dt: datetime) -> str:
-        return dt.isoformat()
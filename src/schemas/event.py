@@ -1,9 +1,23 @@
 from __future__ import annotations
 from datetime import datetime
+from enum import Enum
 from typing import List, Optional
 from uuid import UUID
 from pydantic import BaseModel
 
+# HOW start_date/end_date QUERY BOUNDS MATCH AN EVENT'S [start_date, end_date] SPAN
+class EventDateMode(str, Enum):
+    WITHIN = "within"                # THE EVENT LIES ENTIRELY INSIDE THE WINDOW
+    OVERLAPS = "overlaps"            # THE EVENT SHARES ANY MOMENT WITH THE WINDOW (CALENDAR VIEWS)
+    CONTAINS = "contains"            # THE EVENT SPANS THE WHOLE WINDOW
+    STARTS_WITHIN = "starts_within"  # THE EVENT STARTS INSIDE THE WINDOW
+
+# SORT ORDERS FOR GET /events; EACH IS PAGED BY (column, id) OVER A MATCHING INDEX
+class EventSort(str, Enum):
+    START_DATE = "start_date"
+    CREATED_AT = "created_at"
+    TITLE = "title"
+
 # EVENT MODELS FOR EVENT MANAGEMENT AND REGISTRATION
 class EventBase(BaseModel):
     title: str
@@ -51,3 +65,7 @@ class EventWithAttendees(Event):
 
     class Config:
         from_attributes = True
+
+class EventSearchResult(Event):
+    rank: float
+    snippet: Optional[str] = None
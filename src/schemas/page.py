@@ -0,0 +1,9 @@
+from typing import Generic, List, Optional, TypeVar
+from pydantic import BaseModel
+
+T = TypeVar("T")
+
+# CURSOR-PAGINATED RESPONSE ENVELOPE: ONE PAGE OF ITEMS PLUS THE CURSOR FOR THE NEXT PAGE (NONE ON THE LAST PAGE)
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
@@ -1,7 +1,8 @@
 from datetime import datetime
 from enum import Enum
+from typing import List, Optional
 from uuid import UUID
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 # EVENT REGISTRATION SCHEMAS FOR MANAGING ATTENDEES AND EVENTS
@@ -30,3 +31,23 @@ class Registration(RegistrationBase):
 
     class Config:
         from_attributes = True 
+
+class WaitlistPosition(BaseModel):
+    registration_id: UUID
+    event_id: UUID
+    attendee_id: UUID
+    position: int
+
+class BulkRegistrationCreate(BaseModel):
+    items: List[RegistrationCreate] = Field(..., min_length=1, max_length=10000)
+
+class BulkRegistrationResult(BaseModel):
+    index: int
+    status_code: int
+    registration: Optional[Registration] = None
+    detail: Optional[str] = None
+
+class BulkRegistrationResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkRegistrationResult]
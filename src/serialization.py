@@ -0,0 +1,39 @@
+from functools import lru_cache
+from typing import Any, List, Optional
+
+from fastapi.responses import Response
+from pydantic import TypeAdapter
+
+from src.fields import FIELDSET_CACHE_SIZE
+from src.schemas import Attendee, Category, Page, Registration
+from src.schemas.event import Event
+
+# FAST RESPONSE PATH. FastAPI'S DEFAULT PATH VALIDATES A ROUTE'S RETURN VALUE AGAINST response_model, DUMPS IT BACK
+# TO PYTHON DICTS AND LISTS, AND ONLY THEN ENCODES THOSE WITH json.dumps. THE HOT READ ROUTES INSTEAD RETURN
+# json_response(), WHICH VALIDATES THE ORM OBJECTS AND WRITES JSON BYTES IN ONE RUST PASS (pydantic-core), WITH A
+# TypeAdapter BUILT ONCE PER TYPE. EVERYTHING ELSE GOES THROUGH ORJSONResponse, THE APP'S DEFAULT RESPONSE CLASS.
+# response_model STAYS ON THE ROUTES FOR THE OPENAPI SCHEMA.
+# To measure: python -m benchmarks.serialization
+
+
+@lru_cache(maxsize=FIELDSET_CACHE_SIZE)
+def adapter(type_: Any) -> TypeAdapter:
+    """The TypeAdapter for `type_`, compiled on first use and reused after that."""
+    return TypeAdapter(type_)
+
+
+def dump_json(content: Any, type_: Any) -> bytes:
+    """Validate `content` (ORM objects are read by attribute) against `type_` and encode it as JSON."""
+    type_adapter = adapter(type_)
+    return type_adapter.dump_json(type_adapter.validate_python(content, from_attributes=True))
+
+
+def json_response(content: Any, type_: Any, status_code: int = 200, headers: Optional[dict] = None) -> Response:
+    return Response(dump_json(content, type_), status_code=status_code, headers=headers, media_type="application/json")
+
+
+# COMPILE THE RESPONSE SHAPES OF THE LIST AND DETAIL ROUTES AT IMPORT, NOT ON THE FIRST REQUEST
+for _schema in (Event, Attendee, Registration, Category):
+    adapter(_schema)
+    adapter(List[_schema])
+    adapter(Page[_schema])
@@ -0,0 +1,9 @@
+from . import attendee_import
+from . import registration_export
+from . import registrations
+
+__all__ = [
+    'attendee_import',
+    'registration_export',
+    'registrations'
+]
@@ -0,0 +1,282 @@
+import asyncio
+import codecs
+import csv
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import AsyncIterator, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import Config
+from src.schemas.attendee import AttendeeImportRow
+
+# STREAMING ATTENDEE IMPORT: THE UPLOAD IS READ IN CHUNKS OF CHUNK_SIZE ROWS, EACH CHUNK IS VALIDATED ACROSS A
+# PROCESS POOL AND COPIED INTO A TEMP STAGING TABLE, THEN ONE INSERT ... ON CONFLICT (email) MERGES EVERYTHING.
+# ONLY ONE CHUNK IS IN MEMORY AT A TIME; REJECTED ROWS ARE WRITTEN TO AN ERROR REPORT ON DISK.
+CHUNK_SIZE = 5000
+ERROR_REPORT_DIR = Path(tempfile.gettempdir()) / "eventilly-imports"
+STAGING_COLUMNS = ("line", "first_name", "last_name", "email", "phone")
+
+WORKERS = os.cpu_count() or 1
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_pool() -> ProcessPoolExecutor:
+    # SPAWN, NOT FORK: THE PARENT IS A RUNNING EVENT LOOP WITH OPEN SOCKETS AND THREADS
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+def shutdown_pool() -> None:
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(cancel_futures=True)
+        _pool = None
+
+
+def sweep_error_reports(max_age: float) -> int:
+    """Delete error reports older than `max_age` seconds and return how many were removed."""
+    cutoff = time.time() - max_age
+    removed = 0
+    for path in ERROR_REPORT_DIR.glob("*.csv"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        # ANOTHER WORKER MAY SWEEP THE SAME FILE FIRST
+        except FileNotFoundError:
+            continue
+    return removed
+
+
+def validate_rows(rows: List[Tuple[int, dict]]) -> Tuple[list, list]:
+    """Validate (line, raw row) pairs against AttendeeImportRow. Runs in a pool worker."""
+    records, errors = [], []
+    for line, raw in rows:
+        try:
+            attendee = AttendeeImportRow.model_validate(raw)
+        except ValidationError as exc:
+            message = "; ".join(
+                f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}"
+                for error in exc.errors()
+            )
+            errors.append((line, message, json.dumps(raw, default=str)))
+            continue
+        records.append((line, attendee.first_name, attendee.last_name, attendee.email, attendee.phone))
+    return records, errors
+
+
+async def _lines(stream: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    # PHYSICAL LINES WITH THEIR "\n", SO A NEWLINE INSIDE A QUOTED CSV FIELD SURVIVES
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    async for chunk in stream:
+        buffer += decoder.decode(chunk)
+        *complete, buffer = buffer.split("\n")
+        for line in complete:
+            yield line + "\n"
+    buffer += decoder.decode(b"", final=True)
+    if buffer:
+        yield buffer
+
+
+class _LineFeed:
+    """Input of the upload's single csv.reader; lines are pushed one complete CSV record at a time."""
+
+    def __init__(self):
+        self.lines: deque = deque()
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> str:
+        if not self.lines:
+            raise StopIteration
+        return self.lines.popleft()
+
+
+async def _ndjson_rows(stream: AsyncIterator[bytes], errors: list) -> AsyncIterator[Tuple[int, dict]]:
+    line_no = 0
+    async for line in _lines(stream):
+        line_no += 1
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            continue
+        try:
+            raw = json.loads(line)
+        except json.JSONDecodeError as exc:
+            errors.append((line_no, f"row: invalid JSON ({exc.msg})", line))
+            continue
+        if not isinstance(raw, dict):
+            errors.append((line_no, "row: expected a JSON object", line))
+            continue
+        yield line_no, raw
+
+
+async def _csv_rows(stream: AsyncIterator[bytes], errors: list) -> AsyncIterator[Tuple[int, dict]]:
+    # ONE csv.reader FOR THE WHOLE UPLOAD, SO ITS QUOTING STATE CARRIES ACROSS LINES. WHILE A QUOTED FIELD IS OPEN
+    # (AN ODD NUMBER OF QUOTES SO FAR) LINES ARE HELD BACK, SO THE READER NEVER RUNS DRY IN THE MIDDLE OF A RECORD.
+    # LINE NUMBERS ARE THE PHYSICAL LINE A RECORD STARTS ON, FROM reader.line_num.
+    feed = _LineFeed()
+    reader = csv.reader(feed)
+    header = None
+    pending: List[str] = []
+    quotes = 0
+    async for line in _lines(stream):
+        pending.append(line)
+        quotes += line.count('"')
+        if quotes % 2:
+            continue
+        feed.lines.extend(pending)
+        pending, quotes = [], 0
+        line_no = reader.line_num + 1
+        values = next(reader)
+        if not any(value.strip() for value in values):
+            continue
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        yield line_no, dict(zip(header, values))
+    if pending:
+        errors.append((reader.line_num + 1, "row: unterminated quoted field", "".join(pending)))
+
+
+def _rows(stream: AsyncIterator[bytes], fmt: str, errors: list) -> AsyncIterator[Tuple[int, dict]]:
+    return _ndjson_rows(stream, errors) if fmt == "ndjson" else _csv_rows(stream, errors)
+
+
+@dataclass
+class ImportSummary:
+    import_id: str
+    rows: int
+    inserted: int
+    updated: int
+    failed: int
+    error_report: Optional[Path]
+
+
+_CREATE_STAGING_SQL = text("""
+CREATE TEMP TABLE attendee_import_staging (
+    line integer NOT NULL,
+    first_name varchar(50),
+    last_name varchar(50),
+    email varchar(100),
+    phone varchar(20)
+) ON COMMIT DROP
+""")
+
+# LAST OCCURRENCE OF AN EMAIL IN THE FILE WINS; EXISTING ATTENDEES ARE UPDATED IN PLACE.
+# (xmax = 0) IS TRUE FOR FRESHLY INSERTED ROWS AND FALSE FOR ROWS TAKEN BY THE DO UPDATE BRANCH.
+_MERGE_SQL = text("""
+WITH merged AS (
+    INSERT INTO attendees (id, first_name, last_name, email, phone)
+    SELECT gen_random_uuid(), first_name, last_name, email, phone
+    FROM (
+        SELECT DISTINCT ON (email) first_name, last_name, email, phone
+        FROM attendee_import_staging
+        ORDER BY email, line DESC
+    ) AS latest
+    ON CONFLICT (email) DO UPDATE SET
+        first_name = EXCLUDED.first_name,
+        last_name = EXCLUDED.last_name,
+        phone = EXCLUDED.phone,
+        updated_at = now()
+    RETURNING (xmax = 0) AS inserted
+)
+SELECT count(*) FILTER (WHERE inserted) AS inserted,
+       count(*) FILTER (WHERE NOT inserted) AS updated
+FROM merged
+""")
+
+
+async def import_attendees(db: AsyncSession, stream: AsyncIterator[bytes], fmt: str) -> ImportSummary:
+    """Stream, validate, COPY and merge an attendee upload. The caller commits."""
+    import_id = uuid.uuid4().hex
+    ERROR_REPORT_DIR.mkdir(parents=True, exist_ok=True)
+    sweep_error_reports(Config.IMPORT_REPORT_TTL_SECONDS)
+    report_path = ERROR_REPORT_DIR / f"{import_id}.csv"
+
+    await db.execute(_CREATE_STAGING_SQL)
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    copy_target = raw_connection.driver_connection
+
+    loop = asyncio.get_running_loop()
+    pool = get_pool()
+
+    total = failed = 0
+    parse_errors: list = []
+    with report_path.open("w", newline="") as report_file:
+        report = csv.writer(report_file)
+        report.writerow(["line", "error", "row"])
+
+        async def flush(chunk: list) -> None:
+            nonlocal failed
+            size = -(-len(chunk) // WORKERS)
+            parts = [chunk[i:i + size] for i in range(0, len(chunk), size)]
+            results = await asyncio.gather(*(loop.run_in_executor(pool, validate_rows, part) for part in parts))
+            records = [record for part_records, _ in results for record in part_records]
+            for _, part_errors in results:
+                report.writerows(part_errors)
+                failed += len(part_errors)
+            if records:
+                await copy_target.copy_records_to_table(
+                    "attendee_import_staging", records=records, columns=STAGING_COLUMNS
+                )
+
+        def record_parse_errors() -> None:
+            nonlocal failed, total
+            report.writerows(parse_errors)
+            failed += len(parse_errors)
+            total += len(parse_errors)
+            parse_errors.clear()
+
+        chunk: list = []
+        async for row in _rows(stream, fmt, parse_errors):
+            chunk.append(row)
+            total += 1
+            if len(chunk) >= CHUNK_SIZE:
+                await flush(chunk)
+                chunk = []
+                record_parse_errors()
+        if chunk:
+            await flush(chunk)
+        record_parse_errors()
+
+    merged = (await db.execute(_MERGE_SQL)).one()
+    if not failed:
+        report_path.unlink(missing_ok=True)
+    return ImportSummary(
+        import_id=import_id,
+        rows=total,
+        inserted=merged.inserted,
+        updated=merged.updated,
+        failed=failed,
+        error_report=report_path if failed else None,
+    )
+
+
+def error_report_path(import_id: str) -> Optional[Path]:
+    # import_id IS A uuid4 HEX STRING; ANYTHING ELSE COULD ESCAPE THE REPORT DIRECTORY
+    try:
+        uuid.UUID(hex=import_id)
+    except ValueError:
+        return None
+    path = ERROR_REPORT_DIR / f"{uuid.UUID(hex=import_id).hex}.csv"
+    return path if path.exists() else None
@@ -0,0 +1,213 @@
+import asyncio
+import zlib
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from src.config import Config
+
+# REGISTRATION EXPORT: COPY ... TO STDOUT STREAMED STRAIGHT TO THE CLIENT, NEVER MATERIALIZED AS ORM OBJECTS.
+# A PARALLEL EXPORT SPLITS THE TABLE INTO ctid BLOCK RANGES (TID RANGE SCANS, POSTGRES 14+) AND COPIES EACH
+# RANGE ON ITS OWN CONNECTION. ALL CONNECTIONS SHARE ONE SNAPSHOT FROM pg_export_snapshot(), SO THE CHUNKS
+# TOGETHER ARE ONE CONSISTENT VIEW OF THE TABLE.
+# THE COLUMNS OF A FULL EXPORT, IN FILE ORDER. ?fields= PICKS A SUBSET, STILL IN THIS ORDER.
+EXPORT_COLUMNS = ("id", "event_id", "attendee_id", "status", "registration_date", "created_at", "updated_at")
+
+# PER-CHUNK BUFFER OF COPY DATA MESSAGES. WHEN THE CLIENT READS SLOWLY THE QUEUES FILL AND THE COPIES PAUSE.
+QUEUE_SIZE = 64
+
+_DONE = object()
+
+# EXPORTS SHARE THE PRIMARY POOL WITH EVERY OTHER ROUTE AND HOLD THEIR CONNECTIONS FOR AS LONG AS THE CLIENT TAKES
+# TO READ. AT MOST EXPORT_MAX_CONNECTIONS OF THE POOL'S CONNECTIONS (PER WORKER) ARE EVER EXPORTING: AN EXPORT WAITS
+# FOR ONE SLOT AND TAKES MORE FOR parallel ONLY WHILE THEY ARE FREE, SO IT RUNS WITH FEWER CHUNKS INSTEAD OF WAITING.
+_slots: Optional[asyncio.Semaphore] = None
+
+
+def _abort(queue: asyncio.Queue) -> None:
+    # ON FAILURE THE PARTIAL DATA IS WORTHLESS: DROP IT SO THE END MARKER CAN NEVER BLOCK
+    while not queue.empty():
+        queue.get_nowait()
+    queue.put_nowait(_DONE)
+
+
+def _select(
+    columns: str, event_id: Optional[UUID], status: Optional[str], block_range: Optional[tuple], fmt: str
+) -> tuple:
+    conditions, args = [], []
+    if event_id is not None:
+        args.append(event_id)
+        conditions.append(f"event_id = ${len(args)}")
+    if status is not None:
+        args.append(status)
+        conditions.append(f"status = ${len(args)}")
+    if block_range is not None:
+        start, end = block_range
+        conditions.append(f"ctid >= '({int(start)},0)'::tid")
+        if end is not None:
+            conditions.append(f"ctid < '({int(end)},0)'::tid")
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    if fmt == "ndjson":
+        query = f"SELECT row_to_json(r)::text FROM (SELECT {columns} FROM registrations{where}) AS r"
+    else:
+        query = f"SELECT {columns} FROM registrations{where}"
+    return query, args
+
+
+def _copy_options(fmt: str, header: bool) -> dict:
+    if fmt == "ndjson":
+        # ONE JSON DOCUMENT PER LINE. CSV MODE WITH QUOTE/DELIMITER BYTES THAT row_to_json NEVER EMITS
+        # (IT ESCAPES CONTROL CHARACTERS) PASSES THE JSON THROUGH WITHOUT COPY'S TEXT-FORMAT BACKSLASH ESCAPING.
+        return {"format": "csv", "quote": "\x01", "delimiter": "\x02"}
+    return {"format": "csv", "header": header}
+
+
+async def _copy_into(connection: AsyncConnection, query: str, args: list, options: dict, queue: asyncio.Queue) -> None:
+    raw_connection = await connection.get_raw_connection()
+
+    async def sink(data: bytes) -> None:
+        await queue.put(bytes(data))
+
+    await raw_connection.driver_connection.copy_from_query(query, *args, output=sink, **options)
+
+
+@asynccontextmanager
+async def _connection_slots(wanted: int) -> AsyncIterator[int]:
+    global _slots
+    if _slots is None:
+        _slots = asyncio.Semaphore(max(1, Config.EXPORT_MAX_CONNECTIONS))
+    await _slots.acquire()
+    granted = 1
+    try:
+        # A FREE SEMAPHORE IS ACQUIRED WITHOUT SUSPENDING, SO THESE NEVER WAIT BEHIND OTHER EXPORTS
+        while granted < wanted and not _slots.locked():
+            await _slots.acquire()
+            granted += 1
+        yield granted
+    finally:
+        for _ in range(granted):
+            _slots.release()
+
+
+async def _run_chunk(
+    engine: AsyncEngine,
+    snapshot_id: str,
+    imported: asyncio.Event,
+    query: str,
+    args: list,
+    options: dict,
+    queue: asyncio.Queue,
+) -> None:
+    try:
+        async with engine.connect() as connection:
+            connection = await connection.execution_options(isolation_level="REPEATABLE READ")
+            async with connection.begin():
+                # MUST BE THE FIRST STATEMENT OF THE TRANSACTION
+                await connection.execute(text(f"SET TRANSACTION SNAPSHOT '{snapshot_id}'"))
+                imported.set()
+                await _copy_into(connection, query, args, options, queue)
+    except BaseException:
+        _abort(queue)
+        raise
+    finally:
+        imported.set()
+    await queue.put(_DONE)
+
+
+async def _produce(
+    engine: AsyncEngine,
+    parallel: int,
+    columns: str,
+    event_id: Optional[UUID],
+    status: Optional[str],
+    fmt: str,
+    queues: List[asyncio.Queue],
+    ready: asyncio.Future,
+) -> None:
+    tasks = []
+    async with _connection_slots(parallel) as parallel:
+        try:
+            async with engine.connect() as connection:
+                connection = await connection.execution_options(isolation_level="REPEATABLE READ")
+                async with connection.begin():
+                    snapshot_id = (await connection.execute(text("SELECT pg_export_snapshot()"))).scalar_one()
+                    blocks = (await connection.execute(text(
+                        "SELECT pg_relation_size('registrations') / current_setting('block_size')::bigint"
+                    ))).scalar_one()
+
+                    chunks = max(1, min(parallel, blocks))
+                    step = -(-blocks // chunks) if blocks else 0
+                    ranges = [
+                        (i * step, (i + 1) * step if i < chunks - 1 else None) for i in range(chunks)
+                    ] if chunks > 1 else [None]
+                    ready.set_result(len(ranges))
+
+                    imported = []
+                    for index, block_range in enumerate(ranges[1:], start=1):
+                        event = asyncio.Event()
+                        imported.append(event)
+                        query, args = _select(columns, event_id, status, block_range, fmt)
+                        tasks.append(asyncio.create_task(_run_chunk(
+                            engine, snapshot_id, event, query, args, _copy_options(fmt, False), queues[index]
+                        )))
+
+                    # THIS CONNECTION COPIES THE FIRST CHUNK ITSELF
+                    query, args = _select(columns, event_id, status, ranges[0], fmt)
+                    await _copy_into(connection, query, args, _copy_options(fmt, True), queues[0])
+                    await queues[0].put(_DONE)
+                    # THE EXPORTED SNAPSHOT ONLY EXISTS WHILE THIS TRANSACTION IS OPEN
+                    await asyncio.gather(*(event.wait() for event in imported))
+            await asyncio.gather(*tasks)
+        except BaseException as exc:
+            for task in tasks:
+                task.cancel()
+            for queue in queues:
+                _abort(queue)
+            if not ready.done():
+                ready.set_exception(exc)
+            # HAND THE SLOTS BACK ONLY ONCE THE CHUNK CONNECTIONS ARE BACK IN THE POOL
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+
+async def stream_export(
+    engine: AsyncEngine,
+    event_id: Optional[UUID] = None,
+    status: Optional[str] = None,
+    fmt: str = "csv",
+    parallel: int = 1,
+    compress: bool = False,
+    fields: Optional[Sequence[str]] = None,
+) -> AsyncIterator[bytes]:
+    """
+    Yield the export as bytes, chunk outputs concatenated in table order. With `compress` the
+    stream is a single gzip member. `fields` limits the export to those of EXPORT_COLUMNS.
+    """
+    # ONLY NAMES FROM EXPORT_COLUMNS EVER REACH THE SQL TEXT
+    selected = [column for column in EXPORT_COLUMNS if fields is None or column in fields]
+    if not selected:
+        raise ValueError(f"No export columns among {fields!r}")
+    columns = ", ".join(selected)
+    queues = [asyncio.Queue(maxsize=QUEUE_SIZE) for _ in range(max(1, parallel))]
+    ready = asyncio.get_running_loop().create_future()
+    producer = asyncio.create_task(_produce(engine, parallel, columns, event_id, status, fmt, queues, ready))
+    compressor = zlib.compressobj(wbits=31) if compress else None
+    try:
+        chunk_count = await ready
+        for queue in queues[:chunk_count]:
+            while (data := await queue.get()) is not _DONE:
+                if compressor is not None:
+                    data = compressor.compress(data)
+                    if not data:
+                        continue
+                yield data
+        await producer
+        if compressor is not None:
+            yield compressor.flush()
+    finally:
+        if not producer.done():
+            producer.cancel()
@@ -0,0 +1,394 @@
+import uuid
+from dataclasses import dataclass
+from typing import Any, Optional
+from uuid import UUID
+
+from sqlalchemy import select, text, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models.models import Event, RegistrationStatus
+
+# STATUSES THAT OCCUPY ONE OF AN EVENT'S max_capacity SEATS (COUNTED IN events.seats_taken)
+SEAT_HOLDING_STATUSES = frozenset({RegistrationStatus.REGISTERED.value, RegistrationStatus.CONFIRMED.value})
+
+
+def holds_seat(status: str) -> bool:
+    return status in SEAT_HOLDING_STATUSES
+
+
+# SEAT BOOKKEEPING IS NOT AN EDIT OF THE EVENT ITSELF, SO THE UPDATES BELOW PIN updated_at TO ITS CURRENT
+# VALUE INSTEAD OF LETTING THE COLUMN'S onupdate=now() FIRE.
+
+
+# ONE STATEMENT THAT CHECKS THE EVENT, THE ATTENDEE, DUPLICATES AND CAPACITY, THEN INSERTS.
+# THE SEAT IS CLAIMED BY A CONDITIONAL UPDATE OF THE EVENT ROW: CONCURRENT CLAIMS QUEUE ON THAT ROW LOCK
+# AND POSTGRES RE-CHECKS `seats_taken < max_capacity` AGAINST THE LATEST VERSION, SO IT CANNOT OVERBOOK.
+# A COUNT(*) OVER REGISTRATIONS WOULD READ THE STATEMENT'S SNAPSHOT AND COULD.
+# WITHOUT A SEAT, `queue` TAKES THE NEXT WAITLIST NUMBER FROM THE SAME ROW INSTEAD (THE TWO UPDATES NEVER BOTH
+# CHANGE IT: queue ONLY RUNS WHEN seat RETURNED NOTHING).
+_REGISTER_SQL = text("""
+WITH ev AS (
+    SELECT id FROM events WHERE id = :event_id
+),
+att AS (
+    SELECT id FROM attendees WHERE id = :attendee_id
+),
+seat AS (
+    UPDATE events SET seats_taken = seats_taken + 1
+    WHERE id = :event_id
+      AND CAST(:wants_seat AS boolean)
+      AND (max_capacity IS NULL OR seats_taken < max_capacity)
+      AND EXISTS (SELECT 1 FROM att)
+      AND NOT EXISTS (
+          SELECT 1 FROM registrations WHERE event_id = :event_id AND attendee_id = :attendee_id
+      )
+    RETURNING id
+),
+queue AS (
+    UPDATE events SET waitlist_tail = waitlist_tail + 1
+    WHERE id = :event_id
+      AND (CAST(:wants_seat AS boolean) OR CAST(:status AS varchar) = 'waitlisted')
+      AND NOT EXISTS (SELECT 1 FROM seat)
+      AND EXISTS (SELECT 1 FROM att)
+      AND NOT EXISTS (
+          SELECT 1 FROM registrations WHERE event_id = :event_id AND attendee_id = :attendee_id
+      )
+    RETURNING waitlist_tail
+),
+inserted AS (
+    INSERT INTO registrations (id, event_id, attendee_id, status, registration_date, waitlist_seq)
+    SELECT CAST(:id AS uuid), ev.id, att.id,
+           CASE WHEN CAST(:wants_seat AS boolean) AND NOT EXISTS (SELECT 1 FROM seat)
+                THEN :waitlisted ELSE :status END,
+           now(),
+           (SELECT waitlist_tail FROM queue)
+    FROM ev, att
+    ON CONFLICT ON CONSTRAINT uq_registrations_event_attendee DO NOTHING
+    RETURNING id, event_id, attendee_id, status, registration_date, created_at, updated_at
+)
+SELECT
+    EXISTS (SELECT 1 FROM ev) AS event_found,
+    EXISTS (SELECT 1 FROM att) AS attendee_found,
+    EXISTS (SELECT 1 FROM seat) AS seat_taken,
+    EXISTS (SELECT 1 FROM queue) AS queued,
+    inserted.*
+FROM (SELECT 1) AS one
+LEFT JOIN inserted ON true
+""")
+
+
+@dataclass
+class RegisterOutcome:
+    event_found: bool
+    attendee_found: bool
+    registration: Optional[Any] = None
+
+    @property
+    def duplicate(self) -> bool:
+        return self.event_found and self.attendee_found and self.registration is None
+
+
+async def register(db: AsyncSession, event_id: UUID, attendee_id: UUID, status: str) -> RegisterOutcome:
+    """
+    Insert a registration in one round trip. A seat-holding status falls back to WAITLISTED when the
+    event is full. The caller commits.
+    """
+    result = await db.execute(_REGISTER_SQL, {
+        "id": str(uuid.uuid4()),
+        "event_id": event_id,
+        "attendee_id": attendee_id,
+        "status": status,
+        "wants_seat": holds_seat(status),
+        "waitlisted": RegistrationStatus.WAITLISTED.value,
+    })
+    row = result.one()
+    if row.seat_taken and row.id is None:
+        # LOST A RACE AGAINST AN IDENTICAL REQUEST: THE SEAT WAS CLAIMED BUT THE INSERT HIT THE UNIQUE CONSTRAINT
+        await release_seat(db, event_id)
+    if row.queued and row.id is None:
+        # THE SAME RACE ON A FULL EVENT: HAND THE WAITLIST NUMBER BACK (THIS TRANSACTION STILL HOLDS THE EVENT ROW)
+        await db.execute(_UNQUEUE_SQL, {"event_id": event_id})
+    return RegisterOutcome(
+        event_found=row.event_found,
+        attendee_found=row.attendee_found,
+        registration=row if row.id is not None else None,
+    )
+
+
+async def claim_seat(db: AsyncSession, event_id: UUID) -> bool:
+    """Atomically take one seat if the event has room. Returns False when it is full."""
+    result = await db.execute(
+        update(Event)
+        .where(Event.id == event_id)
+        .where((Event.max_capacity.is_(None)) | (Event.seats_taken < Event.max_capacity))
+        .values(seats_taken=Event.seats_taken + 1, updated_at=Event.updated_at)
+        .returning(Event.id)
+    )
+    return result.scalar_one_or_none() is not None
+
+
+async def release_seat(db: AsyncSession, event_id: UUID) -> None:
+    """Give one seat back to the event."""
+    await db.execute(
+        update(Event)
+        .where(Event.id == event_id, Event.seats_taken > 0)
+        .values(seats_taken=Event.seats_taken - 1, updated_at=Event.updated_at)
+    )
+
+
+async def lock_event(db: AsyncSession, event_id: UUID) -> None:
+    """
+    Lock the event row. Status changes and deletes take it BEFORE the registration row, the order register,
+    promote_waitlisted and register_many already use, so renumbering a queue cannot deadlock.
+    """
+    await db.execute(select(Event.id).where(Event.id == event_id).with_for_update())
+
+
+# WAITLIST QUEUE NUMBERS: A REGISTRATION JOINING THE WAITLIST TAKES events.waitlist_tail + 1. ONE LEAVING FROM
+# ANYWHERE BUT THE HEAD SHIFTS EVERYONE BEHIND IT DOWN BY ONE, SO THE NUMBERS STAY DENSE FROM THE HEAD AND A
+# POSITION IS JUST waitlist_seq - HEAD + 1. THAT WRITE IS O(ENTRIES BEHIND), PAID ONLY ON THE RARE MID-QUEUE EXIT.
+# CALLERS HOLD THE EVENT ROW LOCK.
+_QUEUE_SQL = text("""
+UPDATE events SET waitlist_tail = waitlist_tail + 1 WHERE id = :event_id RETURNING waitlist_tail
+""")
+
+_UNQUEUE_SQL = text("""
+UPDATE events SET waitlist_tail = waitlist_tail - 1 WHERE id = :event_id
+""")
+
+_LEAVE_QUEUE_SQL = text("""
+WITH behind_head AS (
+    SELECT EXISTS (
+        SELECT 1 FROM registrations
+        WHERE event_id = :event_id AND status = 'waitlisted' AND waitlist_seq < :seq
+    ) AS yes
+),
+shifted AS (
+    UPDATE registrations SET waitlist_seq = waitlist_seq - 1
+    WHERE event_id = :event_id AND status = 'waitlisted' AND waitlist_seq > :seq
+      AND (SELECT yes FROM behind_head)
+)
+UPDATE events SET waitlist_tail = waitlist_tail - 1
+WHERE id = :event_id AND (SELECT yes FROM behind_head)
+""")
+
+
+async def join_waitlist(db: AsyncSession, event_id: UUID) -> int:
+    """The next queue number at the back of the event's waitlist."""
+    return (await db.execute(_QUEUE_SQL, {"event_id": event_id})).scalar_one()
+
+
+async def leave_waitlist(db: AsyncSession, event_id: UUID, seq: int) -> None:
+    """Close the gap queue number `seq` left, after its registration was flushed off the waitlist."""
+    await db.execute(_LEAVE_QUEUE_SQL, {"event_id": event_id, "seq": seq})
+
+_RECOUNT_SQL = text("""
+UPDATE events SET seats_taken = coalesce(held.n, 0)
+FROM events AS e
+LEFT JOIN (
+    SELECT event_id, count(*) AS n FROM registrations
+    WHERE status IN ('registered', 'confirmed')
+    GROUP BY event_id
+) AS held ON held.event_id = e.id
+WHERE events.id = e.id
+""")
+
+
+async def recount_seats(db: AsyncSession) -> None:
+    """Rebuild every event's seats_taken from its registrations (after bulk loads written around the service)."""
+    await db.execute(_RECOUNT_SQL)
+
+
+# FILL FREE SEATS FROM THE FRONT OF THE EVENT'S WAITLIST, LOWEST waitlist_seq FIRST. PROMOTION ONLY EVER TAKES
+# THE HEAD OF THE QUEUE, SO THE NUMBERS BEHIND IT NEED NO RENUMBERING.
+# THE EVENT ROW IS LOCKED SO `free` IS EXACT, AND SKIP LOCKED PASSES OVER WAITLISTED ROWS ANOTHER
+# TRANSACTION IS ALREADY CHANGING (E.G. THE ATTENDEE CANCELLING) INSTEAD OF WAITING FOR IT.
+# 'waitlisted' IS A LITERAL, NOT A PARAMETER, SO EVEN A GENERIC PLAN CAN USE THE PARTIAL ix_registrations_waitlist.
+_PROMOTE_SQL = text("""
+WITH ev AS (
+    SELECT CASE WHEN max_capacity IS NULL THEN NULL
+                ELSE greatest(max_capacity - seats_taken, 0) END AS free
+    FROM events WHERE id = :event_id
+    FOR UPDATE
+),
+next AS (
+    SELECT id FROM registrations
+    WHERE event_id = :event_id AND status = 'waitlisted'
+      AND id IS DISTINCT FROM CAST(:exclude_id AS uuid)
+    ORDER BY waitlist_seq
+    LIMIT (SELECT free FROM ev)
+    FOR UPDATE SKIP LOCKED
+),
+promoted AS (
+    UPDATE registrations SET status = :registered, waitlist_seq = NULL, updated_at = now()
+    WHERE id IN (SELECT id FROM next)
+    RETURNING id
+)
+UPDATE events SET seats_taken = seats_taken + (SELECT count(*) FROM promoted)
+WHERE id = :event_id
+RETURNING (SELECT count(*) FROM promoted) AS promoted
+""")
+
+
+async def promote_waitlisted(db: AsyncSession, event_id: UUID, exclude_id: Optional[UUID] = None) -> int:
+    """
+    Promote waitlisted registrations into any free seats, in the caller's transaction.
+    `exclude_id` is a registration the caller has just moved onto the waitlist itself: it holds that row's
+    lock, which SKIP LOCKED does not skip, so without it the row could take back the seat it gave up.
+    Returns how many were promoted.
+    """
+    result = await db.execute(_PROMOTE_SQL, {
+        "event_id": event_id,
+        "exclude_id": exclude_id,
+        "registered": RegistrationStatus.REGISTERED.value,
+    })
+    return result.scalar_one_or_none() or 0
+
+
+# min() OVER THE PARTIAL (event_id, waitlist_seq) INDEX IS ONE DESCENT TO THE HEAD OF THE QUEUE
+_WAITLIST_POSITION_SQL = text("""
+SELECT r.event_id, r.attendee_id, r.status,
+       r.waitlist_seq - (SELECT min(head.waitlist_seq) FROM registrations AS head
+                         WHERE head.event_id = r.event_id AND head.status = 'waitlisted') + 1 AS position
+FROM registrations AS r
+WHERE r.id = :registration_id
+""")
+
+
+async def waitlist_position(db: AsyncSession, registration_id: UUID):
+    """
+    1-based place in the event's waitlist queue: the registration's waitlist_seq less the head's, found with
+    two O(log n) index lookups whatever the queue length. Returns None when the registration does not exist.
+    """
+    result = await db.execute(_WAITLIST_POSITION_SQL, {"registration_id": registration_id})
+    return result.one_or_none()
+
+
+# SET-BASED BULK REGISTRATION: A FIXED NUMBER OF STATEMENTS NO MATTER HOW MANY ITEMS.
+# ARRAYS ARE BOUND AS SINGLE PARAMETERS (ANY / unnest) SO LARGE BATCHES STAY UNDER THE PROTOCOL'S
+# 32767-PARAMETER LIMIT AND REUSE ONE PREPARED STATEMENT.
+_BULK_EVENTS_SQL = text("""
+SELECT id, max_capacity, seats_taken, waitlist_tail FROM events
+WHERE id = ANY(CAST(:ids AS uuid[]))
+ORDER BY id
+FOR UPDATE
+""")
+
+_BULK_ATTENDEES_SQL = text("""
+SELECT id FROM attendees WHERE id = ANY(CAST(:ids AS uuid[]))
+""")
+
+_BULK_EXISTING_SQL = text("""
+SELECT r.event_id, r.attendee_id FROM registrations AS r
+JOIN unnest(CAST(:event_ids AS uuid[]), CAST(:attendee_ids AS uuid[])) AS pair(event_id, attendee_id)
+  ON r.event_id = pair.event_id AND r.attendee_id = pair.attendee_id
+""")
+
+_BULK_INSERT_SQL = text("""
+INSERT INTO registrations (id, event_id, attendee_id, status, registration_date, waitlist_seq)
+SELECT id, event_id, attendee_id, status, now(), waitlist_seq
+FROM unnest(
+    CAST(:ids AS uuid[]), CAST(:event_ids AS uuid[]), CAST(:attendee_ids AS uuid[]), CAST(:statuses AS varchar[]),
+    CAST(:waitlist_seqs AS bigint[])
+) AS item(id, event_id, attendee_id, status, waitlist_seq)
+ON CONFLICT ON CONSTRAINT uq_registrations_event_attendee DO NOTHING
+RETURNING id, event_id, attendee_id, status, registration_date, created_at, updated_at
+""")
+
+_BULK_SEATS_SQL = text("""
+UPDATE events SET seats_taken = seats_taken + claimed.n, waitlist_tail = greatest(waitlist_tail, claimed.tail)
+FROM unnest(
+    CAST(:event_ids AS uuid[]), CAST(:counts AS integer[]), CAST(:tails AS bigint[])
+) AS claimed(event_id, n, tail)
+WHERE events.id = claimed.event_id
+""")
+
+
+@dataclass
+class BulkOutcome:
+    status_code: int
+    registration: Optional[Any] = None
+    detail: Optional[str] = None
+
+
+async def register_many(db: AsyncSession, items: list) -> list:
+    """
+    Register many (event_id, attendee_id, status) items with the same rules as `register`.
+    Returns one BulkOutcome per item, in order; failed items do not abort the batch. The caller commits.
+    """
+    outcomes: list = [None] * len(items)
+    event_ids = sorted({item.event_id for item in items})
+    attendee_ids = list({item.attendee_id for item in items})
+
+    # ONE QUERY EACH: EVENTS (LOCKED IN id ORDER SO CONCURRENT BATCHES CANNOT DEADLOCK), ATTENDEES, DUPLICATES
+    events = {row.id: row for row in await db.execute(_BULK_EVENTS_SQL, {"ids": event_ids})}
+    attendees = {row.id for row in await db.execute(_BULK_ATTENDEES_SQL, {"ids": attendee_ids})}
+    existing = {
+        (row.event_id, row.attendee_id)
+        for row in await db.execute(_BULK_EXISTING_SQL, {
+            "event_ids": [item.event_id for item in items],
+            "attendee_ids": [item.attendee_id for item in items],
+        })
+    }
+
+    free = {
+        event.id: None if event.max_capacity is None else max(event.max_capacity - event.seats_taken, 0)
+        for event in events.values()
+    }
+    tails = {event.id: event.waitlist_tail for event in events.values()}
+    pending = []
+    for index, item in enumerate(items):
+        pair = (item.event_id, item.attendee_id)
+        if item.event_id not in events:
+            outcomes[index] = BulkOutcome(404, detail="Event not found")
+        elif item.attendee_id not in attendees:
+            outcomes[index] = BulkOutcome(404, detail="Attendee not found")
+        elif pair in existing:
+            outcomes[index] = BulkOutcome(400, detail="Attendee is already registered for this event")
+        else:
+            # SEATS ARE HANDED OUT IN REQUEST ORDER; LATER ITEMS FOR A FULL EVENT ARE WAITLISTED
+            status = item.status.value
+            if holds_seat(status):
+                if free[item.event_id] == 0:
+                    status = RegistrationStatus.WAITLISTED.value
+                elif free[item.event_id] is not None:
+                    free[item.event_id] -= 1
+            seq = None
+            if status == RegistrationStatus.WAITLISTED.value:
+                tails[item.event_id] += 1
+                seq = tails[item.event_id]
+            existing.add(pair)
+            pending.append((index, uuid.uuid4(), item, status, seq))
+
+    if pending:
+        result = await db.execute(_BULK_INSERT_SQL, {
+            "ids": [registration_id for _, registration_id, _, _, _ in pending],
+            "event_ids": [item.event_id for _, _, item, _, _ in pending],
+            "attendee_ids": [item.attendee_id for _, _, item, _, _ in pending],
+            "statuses": [status for _, _, _, status, _ in pending],
+            "waitlist_seqs": [seq for _, _, _, _, seq in pending],
+        })
+        inserted = {row.id: row for row in result}
+
+        claimed: dict = {}
+        for index, registration_id, item, _, _ in pending:
+            row = inserted.get(registration_id)
+            if row is None:
+                # INSERTED BY A CONCURRENT REQUEST BETWEEN THE DUPLICATE CHECK AND THE INSERT
+                outcomes[index] = BulkOutcome(400, detail="Attendee is already registered for this event")
+                continue
+            outcomes[index] = BulkOutcome(201, registration=row)
+            if holds_seat(row.status):
+                claimed[row.event_id] = claimed.get(row.event_id, 0) + 1
+
+        # THE TAIL MOVES PAST EVERY NUMBER HANDED OUT, EVEN ONE WHOSE INSERT LOST A RACE, SO NONE IS REUSED
+        queued = [event_id for event_id, event in events.items() if tails[event_id] != event.waitlist_tail]
+        touched = list(dict.fromkeys([*claimed, *queued]))
+        if touched:
+            await db.execute(_BULK_SEATS_SQL, {
+                "event_ids": touched,
+                "counts": [claimed.get(event_id, 0) for event_id in touched],
+                "tails": [tails[event_id] for event_id in touched],
+            })
+
+    return outcomes
@@ -0,0 +1,122 @@
+import asyncio
+import json
+import logging
+import re
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+from src.config import Config
+
+# SLOW-QUERY LOG. THE CURSOR LISTENER IN src/instrumentation.py HANDS EVERY STATEMENT SLOWER THAN
+# SLOW_QUERY_MS TO capture(), WHICH RECORDS IT (PARAMETERS REDACTED TO THEIR TYPES) IN A BOUNDED RING BUFFER
+# AND QUEUES IT FOR A BACKGROUND TASK THAT ATTACHES THE PLAN. EXPLAIN ANALYZE RE-EXECUTES THE QUERY, SO IT IS
+# ONLY USED FOR READS AND ONLY ON A REPLICA; WITHOUT ONE, THE PLAN IS A PLAIN EXPLAIN ON THE ORIGINAL ENGINE.
+logger = logging.getLogger(__name__)
+
+_EXPLAINABLE = ("select", "with", "insert", "update", "delete", "values")
+# A STATEMENT IS ONLY A READ IF NO KEYWORD HERE APPEARS ANYWHERE IN IT: A WITH CAN HIDE DATA-MODIFYING CTEs AND
+# A SELECT CAN TAKE ROW LOCKS (FOR UPDATE / FOR NO KEY UPDATE / FOR SHARE / FOR KEY SHARE), AND EXPLAIN ANALYZE OF
+# EITHER FAILS IN A READ-ONLY TRANSACTION. A FALSE MATCH (A LITERAL, SAY) ONLY COSTS THE ANALYZE.
+_WRITES = re.compile(r"\b(insert|update|delete|merge|for\s+share|for\s+key\s+share)\b", re.IGNORECASE)
+
+_buffer: deque = deque(maxlen=Config.SLOW_QUERY_BUFFER)
+_pending: Optional[asyncio.Queue] = None
+_worker: Optional[asyncio.Task] = None
+
+
+def redact(parameters: Any) -> Any:
+    """Replace parameter values with their type names, keeping the shape."""
+    if isinstance(parameters, dict):
+        return {key: redact(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [redact(value) for value in parameters]
+    return None if parameters is None else type(parameters).__name__
+
+
+def capture(engine_name: str, statement: str, parameters: Any, executemany: bool, elapsed: float, stats) -> None:
+    if executemany:
+        parameters = parameters[0] if parameters else ()
+    entry = {
+        "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+        "duration_ms": round(elapsed * 1000, 2),
+        "engine": engine_name,
+        "route": stats.route if stats is not None else None,
+        "request_id": stats.request_id if stats is not None else None,
+        "statement": statement,
+        "parameters": redact(parameters),
+        "plan": None,
+        "plan_status": "pending",
+    }
+    _buffer.append(entry)
+    logger.warning(
+        "Slow query: %.1f ms on %s", entry["duration_ms"], engine_name,
+        extra={key: entry[key] for key in ("route", "request_id", "statement", "parameters")},
+    )
+
+    if _pending is None or not statement.lstrip().lower().startswith(_EXPLAINABLE):
+        entry["plan_status"] = "skipped"
+        return
+    try:
+        # THE REAL VALUES ONLY LIVE IN THE QUEUE UNTIL THE PLAN IS TAKEN
+        _pending.put_nowait((entry, statement, parameters))
+    except asyncio.QueueFull:
+        entry["plan_status"] = "skipped"
+
+
+async def _explain(engines, entry: dict, statement: str, parameters: Any) -> None:
+    is_read = statement.lstrip().lower().startswith(("select", "with")) and not _WRITES.search(statement)
+    analyze = is_read and bool(engines.replica_names)
+    engine_name = await engines.for_read() if analyze else entry["engine"]
+    options = "ANALYZE, BUFFERS, FORMAT JSON" if analyze else "FORMAT JSON"
+    args = list(parameters.values()) if isinstance(parameters, dict) else list(parameters or ())
+
+    async with engines.engines[engine_name].connect() as conn:
+        # STRAIGHT ON THE DRIVER: NO CURSOR EVENTS, SO THE EXPLAIN IS NEVER CAPTURED ITSELF
+        driver = (await conn.get_raw_connection()).driver_connection
+        async with driver.transaction(readonly=analyze):
+            await driver.execute(f"SET LOCAL statement_timeout = {int(Config.SLOW_QUERY_EXPLAIN_TIMEOUT_MS)}")
+            plan = await driver.fetchval(f"EXPLAIN ({options}) {statement}", *args)
+    entry["plan"] = json.loads(plan) if isinstance(plan, str) else plan
+    entry["plan_status"] = "analyzed" if analyze else "explained"
+    entry["explained_on"] = engine_name
+
+
+async def _run(engines) -> None:
+    while True:
+        entry, statement, parameters = await _pending.get()
+        started = time.perf_counter()
+        try:
+            await _explain(engines, entry, statement, parameters)
+        except asyncio.CancelledError:
+            raise
+        except Exception as error:
+            entry["plan_status"] = "failed"
+            entry["plan_error"] = str(error)
+        logger.debug("Explained slow query in %.1f ms", (time.perf_counter() - started) * 1000)
+
+
+def start(engines) -> None:
+    """Start the background EXPLAIN task; called from life_span after the engines."""
+    global _pending, _worker
+    if Config.SLOW_QUERY_MS <= 0 or _worker is not None:
+        return
+    _pending = asyncio.Queue(maxsize=Config.SLOW_QUERY_BUFFER)
+    _worker = asyncio.create_task(_run(engines))
+
+
+async def stop() -> None:
+    global _pending, _worker
+    if _worker is not None:
+        _worker.cancel()
+        try:
+            await _worker
+        except asyncio.CancelledError:
+            pass
+    _pending, _worker = None, None
+
+
+def entries() -> list:
+    """Captured slow queries, newest first."""
+    return list(reversed(_buffer))
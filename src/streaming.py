@@ -0,0 +1,41 @@
+from typing import Any, AsyncIterator, List, Optional, Tuple
+
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from src.config import Config
+from src.records import records
+from src.serialization import dump_json
+
+# STREAMED JSON ARRAYS FOR THE LIST ROUTES (?stream=true). THE CORE STATEMENT (src.records.select_for) RUNS ON A
+# SERVER-SIDE CURSOR (stream WITH yield_per) AND EACH PARTITION OF ROWS IS WRAPPED IN RECORDS, SERIALIZED AND SENT
+# BEFORE THE NEXT ONE IS FETCHED, SO MEMORY STAYS PROPORTIONAL TO STREAM_CHUNK_ROWS WHATEVER THE RESULT SIZE.
+#
+# BACKPRESSURE: THE ASGI SERVER'S send() BLOCKS WHILE THE CLIENT'S SOCKET BUFFER IS FULL, WHICH PAUSES THIS
+# GENERATOR AND WITH IT THE CURSOR. A CLIENT DISCONNECT CANCELS THE GENERATOR AND CLOSES CURSOR AND CONNECTION.
+#
+# THE ROUTE'S OWN SESSION IS CLOSED WHEN THE ROUTE RETURNS, BEFORE THE BODY IS SENT, SO THE STREAM OPENS ITS
+# OWN CONNECTION ON THE SAME ENGINE (REPLICA OR PRIMARY) THE DEPENDENCY CHOSE.
+
+
+async def _json_array(engine: AsyncEngine, statement, names: Tuple[str, ...], schema: Any, chunk_rows: int) -> AsyncIterator[bytes]:
+    item_type = List[schema]
+    async with engine.connect() as conn:
+        result = await conn.stream(statement.execution_options(yield_per=chunk_rows))
+        separator = b"["
+        async for rows in result.partitions():
+            # dump_json GIVES "[a,b,...]"; DROP THE BRACKETS AND SPLICE THE ITEMS INTO THE OPEN ARRAY
+            body = dump_json(records(rows, names), item_type)
+            yield separator + body[1:-1]
+            separator = b","
+        yield b"[]" if separator == b"[" else b"]"
+
+
+def stream_json(
+    db: AsyncSession, statement, names: Tuple[str, ...], schema: Any, chunk_rows: Optional[int] = None
+) -> StreamingResponse:
+    """Stream the rows of a `select_for(model, names)` statement as one JSON array of `schema`, chunk by chunk."""
+    return StreamingResponse(
+        _json_array(db.bind, statement, names, schema, chunk_rows or Config.STREAM_CHUNK_ROWS),
+        media_type="application/json",
+    )
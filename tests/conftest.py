@@ -0,0 +1,87 @@
+import asyncio
+import os
+import uuid
+from contextlib import asynccontextmanager
+
+import pytest
+
+# TESTS MARKED @pytest.mark.database TALK TO POSTGRES THROUGH THE REAL APP. THEY RUN ONLY WHEN DATABASE_URL IS SET
+# IN THE ENVIRONMENT (THE .env FILE DOES NOT COUNT, SO A PLAIN pytest NEVER TOUCHES THE DATABASE THE APP IS
+# CONFIGURED FOR). POINT IT AT A DISPOSABLE DATABASE MIGRATED TO HEAD:
+#   DATABASE_URL=postgresql+asyncpg://... alembic upgrade head && DATABASE_URL=... python -m pytest tests
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "database: needs a migrated PostgreSQL database in DATABASE_URL")
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.environ.get("DATABASE_URL"):
+        return
+    skip = pytest.mark.skip(reason="DATABASE_URL is not set")
+    for item in items:
+        if "database" in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture
+def run_app():
+    """Run `scenario(client)` inside the app's lifespan, with an httpx client bound to the app, and return its result."""
+    import httpx
+
+    from src.main import app
+
+    async def run(scenario):
+        async with app.router.lifespan_context(app):
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await scenario(client)
+
+    return lambda scenario: asyncio.run(run(scenario))
+
+
+@pytest.fixture
+def scratch_event():
+    """Async context manager: a category, one event of `capacity` seats and `attendees` attendees, removed afterwards."""
+    from sqlalchemy import text
+
+    from src.database import engines
+
+    @asynccontextmanager
+    async def scratch(capacity: int, attendees: int):
+        tag = uuid.uuid4().hex[:8]
+        category_id, event_id = uuid.uuid4(), uuid.uuid4()
+        attendee_ids = [uuid.uuid4() for _ in range(attendees)]
+        async with engines.primary.begin() as conn:
+            await conn.execute(
+                text("INSERT INTO categories (id, name) VALUES (:id, :name)"),
+                {"id": category_id, "name": f"test-{tag}"},
+            )
+            await conn.execute(
+                text(
+                    "INSERT INTO events (id, title, start_date, end_date, max_capacity, is_active, category_id) "
+                    "VALUES (:id, :title, '2030-01-01 09:00+00', '2030-01-01 18:00+00', :capacity, true, :category_id)"
+                ),
+                {"id": event_id, "title": f"Test event {tag}", "capacity": capacity, "category_id": category_id},
+            )
+            if attendee_ids:
+                await conn.execute(
+                    text(
+                        "INSERT INTO attendees (id, first_name, last_name, email, phone) "
+                        "VALUES (:id, 'Test', :last_name, :email, '+10000000000')"
+                    ),
+                    [
+                        {"id": attendee_id, "last_name": str(i), "email": f"test-{tag}-{i}@example.com"}
+                        for i, attendee_id in enumerate(attendee_ids)
+                    ],
+                )
+        try:
+            yield event_id, attendee_ids
+        finally:
+            async with engines.primary.begin() as conn:
+                await conn.execute(text("DELETE FROM registrations WHERE event_id = :e"), {"e": event_id})
+                await conn.execute(text("DELETE FROM events WHERE id = :e"), {"e": event_id})
+                await conn.execute(text("DELETE FROM attendees WHERE email LIKE :p"), {"p": f"test-{tag}-%"})
+                await conn.execute(text("DELETE FROM categories WHERE id = :c"), {"c": category_id})
+
+    return scratch
@@ -0,0 +1,84 @@
+import asyncio
+import os
+import uuid
+
+import httpx
+
+from src.main import app
+from src.services import attendee_import
+from src.services.attendee_import import _rows, validate_rows
+
+
+def _row(**overrides) -> dict:
+    row = {"first_name": "Ada", "last_name": "Okafor", "email": "ada@example.com", "phone": "+1 555 0100"}
+    row.update(overrides)
+    return row
+
+
+def test_valid_row_is_staged():
+    records, errors = validate_rows([(2, _row())])
+    assert records == [(2, "Ada", "Okafor", "ada@example.com", "+1 555 0100")]
+    assert errors == []
+
+
+def test_over_long_row_is_reported_not_staged():
+    rows = [
+        (2, _row()),
+        (3, _row(first_name="A" * 51)),
+        (4, _row(email=f"{'a' * 95}@example.com")),
+        (5, _row(phone="1" * 21)),
+    ]
+    records, errors = validate_rows(rows)
+    assert [record[0] for record in records] == [2]
+    assert [(line, message.split(":")[0]) for line, message, _ in errors] == [
+        (3, "first_name"), (4, "email"), (5, "phone"),
+    ]
+
+
+def _collect(chunks, fmt="csv"):
+    async def stream():
+        for chunk in chunks:
+            yield chunk
+
+    async def run():
+        errors = []
+        rows = [row async for row in _rows(stream(), fmt, errors)]
+        return rows, errors
+
+    return asyncio.run(run())
+
+
+def test_csv_quoted_newline_stays_in_its_field():
+    upload = b'first_name,last_name,email,phone\r\nAda,"Oka\r\nfor",ada@example.com,1\r\n\r\nBo,Li,bo@example.com,2\r\n'
+    # SPLIT MID-RECORD AND MID-LINE, AS A NETWORK STREAM WOULD BE
+    rows, errors = _collect([upload[:40], upload[40:47], upload[47:]])
+    assert errors == []
+    assert [(line, row["last_name"], row["email"]) for line, row in rows] == [
+        (2, "Oka\r\nfor", "ada@example.com"),
+        (5, "Li", "bo@example.com"),
+    ]
+
+
+def test_csv_unterminated_quote_is_an_error():
+    rows, errors = _collect([b'first_name,last_name,email,phone\nAda,"Okafor,ada@example.com,1\n'])
+    assert rows == []
+    assert [(line, message) for line, message, _ in errors] == [(2, "row: unterminated quoted field")]
+
+
+def test_error_report_is_gone_once_swept(tmp_path, monkeypatch):
+    monkeypatch.setattr(attendee_import, "ERROR_REPORT_DIR", tmp_path)
+    stale, fresh = uuid.uuid4().hex, uuid.uuid4().hex
+    for import_id in (stale, fresh):
+        (tmp_path / f"{import_id}.csv").write_text("line,error,row\n")
+    # BACKDATE ONE REPORT PAST A ONE-HOUR TTL
+    os.utime(tmp_path / f"{stale}.csv", (0, 0))
+
+    async def errors(import_id):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return (await client.get(f"/attendees/import/{import_id}/errors")).status_code
+
+    assert asyncio.run(errors(stale)) == 200
+    assert attendee_import.sweep_error_reports(3600) == 1
+    assert asyncio.run(errors(stale)) == 404
+    assert asyncio.run(errors(fresh)) == 200
@@ -0,0 +1,13 @@
+from src.config import Config
+from src.main import app
+
+
+def _query_parameter(path: str, name: str) -> dict:
+    operation = app.openapi()["paths"][path]["get"]
+    return next(parameter for parameter in operation["parameters"] if parameter["name"] == name)["schema"]
+
+
+def test_list_limit_is_capped_like_the_other_list_routes():
+    for path in ("/attendees", "/events", "/registrations"):
+        assert _query_parameter(path, "limit")["maximum"] == Config.MAX_PAGE_SIZE, path
+    assert _query_parameter("/attendees", "skip")["minimum"] == 0
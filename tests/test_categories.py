@@ -0,0 +1,18 @@
+import pytest
+
+pytestmark = pytest.mark.database
+
+
+def test_streamed_categories_match_the_buffered_list(run_app, scratch_event):
+    async def scenario(client):
+        async with scratch_event(capacity=1, attendees=0):
+            listed = (await client.get("/categories")).json()
+            streamed = (await client.get("/categories", params={"stream": "true"})).json()
+            assert listed
+            assert streamed == listed
+            assert [c["name"] for c in listed] == sorted(c["name"] for c in listed)
+
+            sparse = (await client.get("/categories", params={"stream": "true", "fields": "id,name"})).json()
+            assert sparse == [{"id": c["id"], "name": c["name"]} for c in listed]
+
+    run_app(scenario)
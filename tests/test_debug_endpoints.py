@@ -0,0 +1,22 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.config import Config, Settings
+from src.main import app
+
+
+def test_debug_endpoints_are_off_by_default():
+    assert Settings.model_fields["DEBUG_ENDPOINTS_ENABLED"].default is False
+
+
+@pytest.mark.skipif(Config.DEBUG_ENDPOINTS_ENABLED, reason="DEBUG_ENDPOINTS_ENABLED is set")
+def test_debug_endpoints_are_not_mounted_unless_enabled():
+    async def get(path: str) -> int:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return (await client.get(path)).status_code
+
+    assert asyncio.run(get("/debug/pool")) == 404
+    assert asyncio.run(get("/debug/slow-queries")) == 404
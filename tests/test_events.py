@@ -0,0 +1,23 @@
+import pytest
+
+pytestmark = pytest.mark.database
+
+
+def test_event_attendees_come_back_in_the_same_order_streamed_or_not(run_app, scratch_event):
+    async def scenario(client):
+        async with scratch_event(capacity=3, attendees=6) as (event_id, attendees):
+            # REGISTER IN REVERSE SO THE REGISTRATION ORDER DIFFERS FROM THE ATTENDEE ORDER
+            for attendee_id in reversed(attendees):
+                response = await client.post(
+                    "/registrations", json={"event_id": str(event_id), "attendee_id": str(attendee_id)}
+                )
+                assert response.status_code == 201
+
+            listed = (await client.get(f"/events/{event_id}/attendees")).json()
+            streamed = (await client.get(f"/events/{event_id}/attendees", params={"stream": "true"})).json()
+            expected = sorted(listed, key=lambda attendee: (attendee["created_at"], attendee["id"]))
+            assert [a["id"] for a in listed] == [a["id"] for a in expected]
+            assert streamed == listed
+            assert len(listed) == len(attendees)
+
+    run_app(scenario)
@@ -0,0 +1,21 @@
+import pytest
+
+from src.db.generate import GeneratorOptions
+
+
+@pytest.mark.parametrize("overrides, message", [
+    ({"attendees": 0}, "one event and one attendee"),
+    ({"events": 0}, "one event and one attendee"),
+    ({"categories": 0}, "at least one category"),
+    ({"events": 2, "attendees": 2, "registrations": 5}, "more registrations"),
+    ({"registrations": -1}, "registrations must not be negative"),
+    ({"cancelled_rate": 1.5}, "cancelled_rate"),
+    ({"batch_size": 0}, "batch_size"),
+])
+def test_impossible_options_are_rejected_up_front(overrides, message):
+    with pytest.raises(ValueError, match=message):
+        GeneratorOptions(**{"events": 10, "attendees": 10, "registrations": 10, **overrides})
+
+
+def test_an_empty_dataset_is_allowed():
+    GeneratorOptions(categories=0, events=0, attendees=0, registrations=0)
@@ -0,0 +1,33 @@
+import argparse
+import asyncio
+import json
+import logging
+
+import pytest
+
+from benchmarks import plan_check
+from src.main import app
+
+pytestmark = pytest.mark.database
+
+
+def test_query_plans_match_the_committed_baseline():
+    recorded = json.loads(plan_check.BASELINE.read_text())
+    args = argparse.Namespace(
+        scale=recorded["scale"], requests=3, large_rows=10_000, factor=2.0, update_baseline=False,
+    )
+
+    async def run():
+        async with app.router.lifespan_context(app):
+            logging.getLogger("src.access").setLevel(logging.WARNING)
+            # THE CHECK NEVER SEEDS: IT ONLY MEANS SOMETHING ON THE DATA THE BASELINE WAS TAKEN FROM
+            scale = await plan_check.seeded_scale()
+            if scale != recorded["scale"]:
+                return None
+            return await plan_check.check(args, recorded["plans"])
+
+    passed = asyncio.run(run())
+    if passed is None:
+        pytest.skip(f"DATABASE_URL is not seeded at the {recorded['scale']} scale "
+                    f"(python -m benchmarks.plan_check --scale {recorded['scale']} --seed)")
+    assert passed, "query plans regressed against benchmarks/plan_baseline.json; see the output above"
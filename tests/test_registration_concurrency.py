@@ -0,0 +1,43 @@
+import asyncio
+from collections import Counter
+
+import pytest
+from sqlalchemy import text
+
+from src.database import engines
+
+pytestmark = pytest.mark.database
+
+REQUESTS = 500
+CAPACITY = 100
+
+
+def test_a_ticket_drop_never_overbooks(run_app, scratch_event):
+    async def scenario(client):
+        async with scratch_event(capacity=CAPACITY, attendees=REQUESTS) as (event_id, attendees):
+            # THE TICKET DROP: EVERY ATTENDEE ASKS FOR A SEAT AT ONCE
+            responses = await asyncio.gather(*(
+                client.post("/registrations", json={"event_id": str(event_id), "attendee_id": str(attendee_id)})
+                for attendee_id in attendees
+            ))
+            assert Counter(response.status_code for response in responses) == {201: REQUESTS}
+
+            async with engines.primary.connect() as conn:
+                seats_taken = (await conn.execute(
+                    text("SELECT seats_taken FROM events WHERE id = :e"), {"e": event_id}
+                )).scalar_one()
+                statuses = Counter(dict((await conn.execute(
+                    text("SELECT status, count(*) FROM registrations WHERE event_id = :e GROUP BY status"),
+                    {"e": event_id},
+                )).all()))
+                queue = (await conn.execute(text(
+                    "SELECT waitlist_seq FROM registrations WHERE event_id = :e AND status = 'waitlisted' "
+                    "ORDER BY waitlist_seq"
+                ), {"e": event_id})).scalars().all()
+
+            assert seats_taken == CAPACITY
+            assert statuses == {"registered": CAPACITY, "waitlisted": REQUESTS - CAPACITY}
+            # EVERY WAITLISTED REGISTRATION GOT ITS OWN PLACE IN ONE UNBROKEN QUEUE
+            assert queue == list(range(1, REQUESTS - CAPACITY + 1))
+
+    run_app(scenario)
@@ -0,0 +1,103 @@
+import pytest
+from sqlalchemy import text
+
+from src.database import engines
+
+pytestmark = pytest.mark.database
+
+
+async def _statuses(event_id) -> dict:
+    async with engines.primary.connect() as conn:
+        rows = await conn.execute(
+            text("SELECT attendee_id, status FROM registrations WHERE event_id = :e"), {"e": event_id}
+        )
+        return {row.attendee_id: row.status for row in rows}
+
+
+async def _seats_taken(event_id) -> int:
+    async with engines.primary.connect() as conn:
+        return (await conn.execute(
+            text("SELECT seats_taken FROM events WHERE id = :e"), {"e": event_id}
+        )).scalar_one()
+
+
+def test_moving_a_seat_to_the_waitlist_promotes_the_head_of_the_queue(run_app, scratch_event):
+    async def scenario(client):
+        async with scratch_event(capacity=2, attendees=4) as (event_id, attendees):
+            registrations = []
+            for attendee_id in attendees:
+                response = await client.post(
+                    "/registrations", json={"event_id": str(event_id), "attendee_id": str(attendee_id)}
+                )
+                assert response.status_code == 201
+                registrations.append(response.json())
+            assert [r["status"] for r in registrations] == ["registered", "registered", "waitlisted", "waitlisted"]
+
+            # THE OLDEST SEAT HOLDER STEPS DOWN; THE FIRST PERSON WAITING GETS THE SEAT, NOT THE ONE WHO GAVE IT UP
+            response = await client.patch(f"/registrations/{registrations[0]['id']}", json={"status": "waitlisted"})
+            assert response.status_code == 200
+            assert response.json()["status"] == "waitlisted"
+
+            statuses = await _statuses(event_id)
+            assert [statuses[attendee_id] for attendee_id in attendees] == [
+                "waitlisted", "registered", "registered", "waitlisted",
+            ]
+            assert await _seats_taken(event_id) == 2
+
+    run_app(scenario)
+
+
+async def _positions(client, registrations) -> list:
+    positions = []
+    for registration in registrations:
+        response = await client.get(f"/registrations/{registration['id']}/waitlist")
+        positions.append(response.json()["position"] if response.status_code == 200 else None)
+    return positions
+
+
+def test_waitlist_positions_stay_dense_as_entries_leave(run_app, scratch_event):
+    async def scenario(client):
+        async with scratch_event(capacity=1, attendees=6) as (event_id, attendees):
+            registrations = [
+                (await client.post(
+                    "/registrations", json={"event_id": str(event_id), "attendee_id": str(attendee_id)}
+                )).json()
+                for attendee_id in attendees
+            ]
+            assert await _positions(client, registrations) == [None, 1, 2, 3, 4, 5]
+
+            # LEAVING FROM THE MIDDLE MOVES EVERYONE BEHIND UP ONE PLACE
+            response = await client.patch(f"/registrations/{registrations[3]['id']}", json={"status": "cancelled"})
+            assert response.status_code == 200
+            assert await _positions(client, registrations) == [None, 1, 2, None, 3, 4]
+            response = await client.delete(f"/registrations/{registrations[4]['id']}")
+            assert response.status_code == 204
+            assert await _positions(client, registrations) == [None, 1, 2, None, None, 3]
+
+            # A FREED SEAT PROMOTES THE HEAD; THE ONE WHO GAVE IT UP JOINS THE BACK OF THE QUEUE
+            response = await client.patch(f"/registrations/{registrations[0]['id']}", json={"status": "waitlisted"})
+            assert response.status_code == 200
+            assert await _positions(client, registrations) == [3, None, 1, None, None, 2]
+            assert await _seats_taken(event_id) == 1
+
+    run_app(scenario)
+
+
+def test_bulk_registrations_join_the_queue_in_request_order(run_app, scratch_event):
+    async def scenario(client):
+        async with scratch_event(capacity=1, attendees=4) as (event_id, attendees):
+            first = (await client.post(
+                "/registrations", json={"event_id": str(event_id), "attendee_id": str(attendees[0])}
+            )).json()
+            response = await client.post("/registrations/bulk", json={"items": [
+                {"event_id": str(event_id), "attendee_id": str(attendee_id)} for attendee_id in attendees[1:]
+            ]})
+            assert response.status_code == 200
+            bulk = [result["registration"] for result in response.json()["results"]]
+            assert await _positions(client, [first, *bulk]) == [None, 1, 2, 3]
+
+            response = await client.delete(f"/registrations/{first['id']}")
+            assert response.status_code == 204
+            assert await _positions(client, bulk) == [None, 1, 2]
+
+    run_app(scenario)